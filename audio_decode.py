@@ -0,0 +1,228 @@
+"""
+🎚️ Audio Decode - Decode once to the 16 kHz PCM Whisper expects
+
+The source file is decoded a single time by ffmpeg into a mono float32
+NumPy buffer. Long inputs are spilled to a raw PCM file in the temp folder
+and memory-mapped, so chunking is just slicing the buffer: no re-encoding,
+no temporary MP3 files and no second decode inside Whisper.
+
+Author: IA-ismo LAB
+"""
+
+import itertools
+import os
+import queue
+import subprocess
+import sys
+import threading
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Inputs longer than this are memory-mapped instead of held in RAM
+DEFAULT_MMAP_MINUTES = 60
+
+# Bytes read from ffmpeg per iteration (~10 seconds of 16-bit mono)
+_BLOCK_BYTES = SAMPLE_RATE * 2 * 10
+
+# Decoded audio buffered ahead of a slow consumer before the download is paused
+DEFAULT_STREAM_BUFFER_SECONDS = 600
+
+_spill_counter = itertools.count()
+
+# Reference to a slice of a memory-mapped PCM file that can be sent to
+# another process without copying the samples
+PcmRef = namedtuple('PcmRef', ['filename', 'start', 'length'])
+
+def _spill_path(temp_dir):
+    """Return a unique path for a raw PCM spill file."""
+    os.makedirs(temp_dir, exist_ok=True)
+    return os.path.join(temp_dir, f"pcm_{os.getpid()}_{next(_spill_counter)}.f32")
+
+def load_pcm(audio_path, mmap_minutes=DEFAULT_MMAP_MINUTES, temp_dir='temp'):
+    """Decode any ffmpeg-readable file to 16 kHz mono float32 samples."""
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+        "-i", audio_path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "-",
+    ]
+    threshold = int(mmap_minutes * 60 * SAMPLE_RATE)
+    blocks = []
+    total = 0
+    spill = None
+    spill_path = None
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # A damaged file logs one error per bad frame; keep reading so ffmpeg never blocks on stderr
+    errors = _drain(proc.stderr)
+    try:
+        while True:
+            raw = proc.stdout.read(_BLOCK_BYTES)
+            if not raw:
+                break
+            if len(raw) % 2:
+                raw += proc.stdout.read(1)  # Keep whole 16-bit samples
+            samples = np.frombuffer(raw, np.int16).astype(np.float32) / 32768.0
+            total += len(samples)
+
+            # Switch to a disk-backed buffer once the input gets long
+            if spill is None and total > threshold:
+                spill_path = _spill_path(temp_dir)
+                spill = open(spill_path, 'wb')
+                for block in blocks:
+                    spill.write(block.tobytes())
+                blocks = []
+
+            if spill is not None:
+                spill.write(samples.tobytes())
+            else:
+                blocks.append(samples)
+
+        if proc.wait() != 0:
+            raise RuntimeError(f"Failed to decode audio: {_error_text(errors)}")
+    except BaseException:
+        proc.kill()
+        if spill is not None:
+            spill.close()
+            os.remove(spill_path)
+        raise
+
+    if spill is not None:
+        spill.close()
+        # Copy-on-write keeps the buffer writable for torch without touching the file
+        return np.memmap(spill_path, dtype=np.float32, mode='c', shape=(total,))
+    if not blocks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(blocks)
+
+def release_pcm(audio):
+    """Delete the spill file behind a memory-mapped buffer, if any."""
+    filename = getattr(audio, 'filename', None)
+    if filename and os.path.exists(filename):
+        try:
+            os.remove(filename)
+        except OSError:
+            # Still mapped on Windows; cleanup.bat removes leftovers in temp/
+            pass
+
+@contextmanager
+def decoded_audio(audio_path, mmap_minutes=DEFAULT_MMAP_MINUTES, temp_dir='temp'):
+    """Decode audio for the duration of a with-block and clean up after."""
+    audio = load_pcm(audio_path, mmap_minutes=mmap_minutes, temp_dir=temp_dir)
+    try:
+        yield audio
+    finally:
+        release_pcm(audio)
+
+def duration_seconds(audio):
+    """Duration of a decoded buffer in seconds."""
+    return len(audio) / SAMPLE_RATE
+
+def fixed_spans(total_samples, chunk_samples):
+    """Split a buffer into consecutive (start, end) sample spans."""
+    chunk_samples = max(1, int(chunk_samples))
+    return [(start, min(start + chunk_samples, total_samples))
+            for start in range(0, total_samples, chunk_samples)]
+
+def chunk_views(audio, spans, shareable=False):
+    """Return zero-copy chunks of a decoded buffer.
+
+    With shareable=True, chunks of a memory-mapped buffer are returned as
+    PcmRef tuples so worker processes can map the same file instead of
+    receiving pickled copies of the samples.
+    """
+    filename = getattr(audio, 'filename', None)
+    if shareable and isinstance(audio, np.memmap) and filename:
+        return [PcmRef(filename, start, end - start) for start, end in spans]
+    return [audio[start:end] for start, end in spans]
+
+def resolve_chunk(chunk):
+    """Turn a PcmRef back into samples; other chunks pass through."""
+    if isinstance(chunk, PcmRef):
+        return np.memmap(chunk.filename, dtype=np.float32, mode='c',
+                         offset=chunk.start * 4, shape=(chunk.length,))
+    return chunk
+
+def _drain(stream):
+    """Read a process's stderr to the end in a thread; return (thread, last lines)."""
+    lines = deque(maxlen=50)
+    thread = threading.Thread(target=lambda: lines.extend(stream), name="pcm-stream-stderr", daemon=True)
+    thread.start()
+    return thread, lines
+
+def _error_text(drained):
+    thread, lines = drained
+    thread.join(timeout=5)
+    return b"".join(lines).decode('utf-8', errors='replace').strip()
+
+def stream_url_pcm(url, audio_format='bestaudio/best', block_seconds=10,
+                   buffer_seconds=DEFAULT_STREAM_BUFFER_SECONDS):
+    """Yield 16 kHz mono float32 blocks of a URL's audio while it downloads.
+
+    yt-dlp writes the stream to a pipe and ffmpeg decodes it on the fly, so
+    nothing is stored on disk. A reader thread keeps draining ffmpeg into a
+    queue, so the download carries on while the consumer is busy. The queue
+    holds at most buffer_seconds of audio; once it is full the pipes fill up
+    and the download waits for the consumer.
+    """
+    download = subprocess.Popen(
+        [sys.executable, "-m", "yt_dlp", "--quiet", "--no-progress", "--no-playlist",
+         "-f", audio_format, "-o", "-", url],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    decode = subprocess.Popen(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+         "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"],
+        stdin=download.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    download.stdout.close()  # ffmpeg owns the pipe now
+    # Both stderr pipes are read continuously so neither process blocks on a full pipe
+    download_errors = _drain(download.stderr)
+    decode_errors = _drain(decode.stderr)
+    block_bytes = int(SAMPLE_RATE * 2 * block_seconds)
+    blocks = queue.Queue(maxsize=max(1, int(buffer_seconds // block_seconds)))
+    stopped = threading.Event()
+
+    def put(item):
+        # Give up once the consumer has gone, instead of blocking on a full queue forever
+        while not stopped.is_set():
+            try:
+                blocks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def reader():
+        try:
+            while True:
+                raw = decode.stdout.read(block_bytes)
+                if not raw:
+                    break
+                if len(raw) % 2:
+                    raw += decode.stdout.read(1)  # Keep whole 16-bit samples
+                if not put(raw):
+                    break
+        finally:
+            put(None)
+
+    threading.Thread(target=reader, name="pcm-stream-reader", daemon=True).start()
+    try:
+        while True:
+            raw = blocks.get()
+            if raw is None:
+                break
+            yield np.frombuffer(raw, np.int16).astype(np.float32) / 32768.0
+        if download.wait() != 0:
+            raise RuntimeError(f"Failed to download audio: {_error_text(download_errors)}")
+        if decode.wait() != 0:
+            raise RuntimeError(f"Failed to decode audio: {_error_text(decode_errors)}")
+    finally:
+        stopped.set()
+        for proc in (download, decode):
+            if proc.poll() is None:
+                proc.kill()
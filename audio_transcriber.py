@@ -13,21 +13,39 @@ Author: IA-ismo LAB
 
 import sys
 import os
-import whisper
+import metrics
+import transcript_cache
+import stream_transcriber
+import translation_engine
 from google import generativeai as genai
 from datetime import datetime
 import configparser
+import glob
+import hashlib
+import itertools
+import json
+import queue
+import re
+import threading
+
+VALID_EXTENSIONS = ['.mp3', '.m4a', '.wav', '.flac', '.aac']
+
+RESULT_SEPARATOR = "-"*30 + "\n"
 
 def load_config():
     """Load configuration from config.ini or use defaults."""
     config = configparser.ConfigParser()
 
-    # Default settings
-    config.add_section('DEFAULT')
+    # Default settings (the DEFAULT section always exists)
     config.set('DEFAULT', 'whisper_model', 'small')
     config.set('DEFAULT', 'target_language', 'es')
     config.set('DEFAULT', 'keep_temp_files', 'true')
     config.set('DEFAULT', 'verbose', 'true')
+    config.set('DEFAULT', 'output_folder', 'transcriptions')
+    config.set('DEFAULT', 'translation_workers', '2')
+    config.set('DEFAULT', 'batch_queue_size', '4')
+    config.set('DEFAULT', 'transcript_cache', 'true')
+    config.set('DEFAULT', 'transcript_cache_mb', '2048')
 
     # Try to load from config file
     if os.path.exists('config.ini'):
@@ -38,35 +56,33 @@ def load_config():
 
     return config
 
-def setup_ai_services(gemini_api_key):
+def setup_ai_services(gemini_api_key, config):
     """Initialize AI services."""
     try:
         # Configure Gemini AI
         genai.configure(api_key=gemini_api_key)
         print("✅ Gemini AI configured")
 
-        # Load Whisper model
-        config = load_config()
-        model_name = config.get('DEFAULT', 'whisper_model', fallback='small')
-        print(f"🔄 Loading Whisper model: {model_name}")
-        model = whisper.load_model(model_name)
-        print("✅ Whisper model loaded")
-
-        return model
+        # Whisper is loaded lazily, and only on a transcript cache miss
+        transcript_cache.configure(config.getfloat('DEFAULT', 'transcript_cache_mb', fallback=2048))
+        metrics.configure(**metrics.settings_from_config(config))
+        return True
     except Exception as e:
         print(f"❌ Error setting up AI services: {e}")
-        return None
+        return False
 
-def transcribe_audio(model, audio_path):
+def transcribe_audio(audio_path, model_name='small', settings=None, on_segment=None, verbose=True):
     """Transcribe audio file to English text using Whisper."""
     try:
         print(f"🎵 Transcribing audio: {audio_path}")
-        print("⏳ This may take a few minutes depending on audio length...")
+        print("⏳ Segments appear as each chunk of audio is finished...")
 
-        # Transcribe with Whisper
-        result = model.transcribe(audio_path, language='en')
+        # Cache lookup, chunking and model loading happen in the streaming layer
+        transcription = stream_transcriber.transcribe_to_text(
+            audio_path, model=model_name, language='en', device=None,
+            settings=settings, on_segment=on_segment, verbose=verbose,
+        ).strip()
 
-        transcription = result['text'].strip()
         print("✅ Transcription completed")
         print(f"📝 Transcription length: {len(transcription)} characters")
 
@@ -75,66 +91,69 @@ def transcribe_audio(model, audio_path):
         print(f"❌ Error transcribing audio: {e}")
         return None
 
-def translate_text(text, target_language='es'):
+def translate_text(text, target_language='es', backend=None, settings=None):
     """Translate text to target language using Gemini AI."""
     try:
-        print("🌍 Translating to Spanish...")
+        print(f"🌍 Translating to {translation_engine.language_name(target_language)}...")
         print("⏳ Translation in progress...")
 
-        # Create Gemini model
-        model = genai.GenerativeModel('gemini-pro')
-
-        # Create translation prompt
-        prompt = f"""Translate the following English text to Spanish.
-        Provide only the translation, without any additional comments or explanations.
-
-        Text to translate:
-        {text}
-
-        Spanish translation:"""
-
-        # Generate translation
-        response = model.generate_content(prompt)
-        translation = response.text.strip()
+        # Gemini is configured in setup_ai_services; long texts are chunked
+        if backend is None:
+            backend = translation_engine.GeminiBackend(model_name='gemini-pro')
+        translation = translation_engine.translate_text(
+            text, backend, target_lang=target_language, **(settings or {})
+        ).strip()
 
         print("✅ Translation completed")
         print(f"📝 Translation length: {len(translation)} characters")
+        if getattr(backend, 'scheduler', None):
+            print(f"📊 Gemini API: {backend.scheduler.summary()}")
 
         return translation
     except Exception as e:
         print(f"❌ Error translating text: {e}")
         return None
 
+def _write_result_file(path, title, label, audio_path, base_name, body):
+    """Write one result file with the standard header."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"🎧 {title} - {base_name}\n")
+        f.write(f"📅 Processed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"📁 Source: {audio_path}\n")
+        f.write("="*60 + "\n\n")
+        f.write(f"{label}:\n")
+        f.write(RESULT_SEPARATOR)
+        f.write(body)
+
+def read_result_body(path):
+    """Read back the text of a result file without its header."""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return content.split(RESULT_SEPARATOR, 1)[-1]
+
+def save_transcription(audio_path, transcription, output_folder, base_name=None):
+    """Save the transcription of one audio file."""
+    base_name = base_name or os.path.splitext(os.path.basename(audio_path))[0]
+    transcript_file = os.path.join(output_folder, f"{base_name}_transcript.txt")
+    _write_result_file(transcript_file, "Audio Transcription", "ENGLISH TRANSCRIPTION",
+                       audio_path, base_name, transcription)
+    print(f"✅ Transcription saved: {transcript_file}")
+    return transcript_file
+
+def save_translation(audio_path, translation, output_folder, base_name=None):
+    """Save the translation of one audio file."""
+    base_name = base_name or os.path.splitext(os.path.basename(audio_path))[0]
+    translation_file = os.path.join(output_folder, f"{base_name}_spanish.txt")
+    _write_result_file(translation_file, "Audio Translation", "SPANISH TRANSLATION",
+                       audio_path, base_name, translation)
+    print(f"✅ Translation saved: {translation_file}")
+    return translation_file
+
 def save_results(audio_path, transcription, translation, output_folder):
     """Save transcription and translation to files."""
     try:
-        # Get base filename without extension
-        base_name = os.path.splitext(os.path.basename(audio_path))[0]
-
-        # Save transcription
-        transcript_file = os.path.join(output_folder, f"{base_name}_transcript.txt")
-        with open(transcript_file, 'w', encoding='utf-8') as f:
-            f.write(f"🎧 Audio Transcription - {base_name}\n")
-            f.write(f"📅 Processed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"📁 Source: {audio_path}\n")
-            f.write("="*60 + "\n\n")
-            f.write("ENGLISH TRANSCRIPTION:\n")
-            f.write("-"*30 + "\n")
-            f.write(transcription)
-        print(f"✅ Transcription saved: {transcript_file}")
-
-        # Save translation
-        translation_file = os.path.join(output_folder, f"{base_name}_spanish.txt")
-        with open(translation_file, 'w', encoding='utf-8') as f:
-            f.write(f"🎧 Audio Translation - {base_name}\n")
-            f.write(f"📅 Processed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"📁 Source: {audio_path}\n")
-            f.write("="*60 + "\n\n")
-            f.write("SPANISH TRANSLATION:\n")
-            f.write("-"*30 + "\n")
-            f.write(translation)
-        print(f"✅ Translation saved: {translation_file}")
-
+        transcript_file = save_transcription(audio_path, transcription, output_folder)
+        translation_file = save_translation(audio_path, translation, output_folder)
         return transcript_file, translation_file
     except Exception as e:
         print(f"❌ Error saving results: {e}")
@@ -149,13 +168,24 @@ def create_output_folder():
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     process_folder = os.path.join(output_dir, f"transcription_{timestamp}")
-    os.makedirs(process_folder)
+    # Jobs started in the same second (job service workers) get a numbered folder
+    for n in itertools.count(2):
+        try:
+            os.makedirs(process_folder)
+            break
+        except FileExistsError:
+            process_folder = os.path.join(output_dir, f"transcription_{timestamp}_{n}")
     print(f"📁 Created process folder: {process_folder}")
 
     return process_folder
 
-def process_audio_file(audio_path, gemini_api_key):
-    """Process a single audio file: transcribe and translate."""
+def process_audio_file(audio_path, gemini_api_key, config=None):
+    """Process a single audio file: transcribe and translate.
+
+    config defaults to load_config(); the job service passes each job's
+    own configuration. Returns the output folder on success and False
+    otherwise.
+    """
     print("\n" + "="*60)
     print(f"🎧 Processing Audio File: {os.path.basename(audio_path)}")
     print("="*60)
@@ -166,30 +196,40 @@ def process_audio_file(audio_path, gemini_api_key):
         return False
 
     # Check file extension
-    valid_extensions = ['.mp3', '.m4a', '.wav', '.flac', '.aac']
     file_ext = os.path.splitext(audio_path)[1].lower()
-    if file_ext not in valid_extensions:
+    if file_ext not in VALID_EXTENSIONS:
         print(f"❌ Unsupported file format: {file_ext}")
-        print(f"   Supported formats: {', '.join(valid_extensions)}")
+        print(f"   Supported formats: {', '.join(VALID_EXTENSIONS)}")
         return False
 
     # Setup AI services
-    model = setup_ai_services(gemini_api_key)
-    if not model:
+    if config is None:
+        config = load_config()
+    if not setup_ai_services(gemini_api_key, config):
         return False
+    model_name = config.get('DEFAULT', 'whisper_model', fallback='small')
+    settings = stream_transcriber.settings_from_config(config)
+    verbose = config.getboolean('DEFAULT', 'verbose', fallback=True)
+    target_language = config.get('DEFAULT', 'target_language', fallback='es')
+    backend = translation_engine.backend_from_config(config, model_name='gemini-pro')
+    translation_settings = translation_engine.settings_from_config(config)
 
     # Create output folder
     output_folder = create_output_folder()
 
-    # Transcribe audio
-    transcription = transcribe_audio(model, audio_path)
-    if not transcription:
-        return False
+    # The run is recorded as failed if anything below raises
+    with metrics.job(output_folder, type='audio') as job_metrics:
+        # Transcribe audio
+        transcription = transcribe_audio(audio_path, model_name, settings, verbose=verbose)
+        if not transcription:
+            job_metrics.finish('failed')
+            return False
 
-    # Translate to Spanish
-    translation = translate_text(transcription)
-    if not translation:
-        return False
+        # Translate to Spanish
+        translation = translate_text(transcription, target_language, backend, translation_settings)
+        if not translation:
+            job_metrics.finish('failed')
+            return False
 
     # Save results
     transcript_file, translation_file = save_results(
@@ -204,11 +244,194 @@ def process_audio_file(audio_path, gemini_api_key):
         print(f"📝 Transcription: {os.path.basename(transcript_file)}")
         print(f"🌍 Translation: {os.path.basename(translation_file)}")
         print("="*60)
-        return True
+        return output_folder
     else:
         print("❌ Failed to save results")
         return False
 
+def is_batch_source(source):
+    """Tell whether the argument names a folder or glob instead of one file."""
+    return os.path.isdir(source) or any(ch in source for ch in '*?[')
+
+def collect_audio_files(source):
+    """Expand a folder or glob pattern into a sorted list of audio files."""
+    if os.path.isdir(source):
+        candidates = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        candidates = glob.glob(source, recursive=True)
+
+    files = [os.path.abspath(path) for path in candidates
+             if os.path.isfile(path) and os.path.splitext(path)[1].lower() in VALID_EXTENSIONS]
+    return sorted(files)
+
+def create_batch_folder(source, output_dir="transcriptions"):
+    """Return the folder for a batch run.
+
+    The same source always maps to the same folder, which is what lets an
+    interrupted run pick up where it stopped.
+    """
+    key = hashlib.sha1(os.path.abspath(source).encode('utf-8')).hexdigest()[:8]
+    label = re.sub(r'[^A-Za-z0-9_-]+', '_', source).strip('_')[-40:] or "audio"
+    batch_folder = os.path.join(output_dir, f"batch_{label}_{key}")
+    if not os.path.exists(batch_folder):
+        os.makedirs(batch_folder)
+        print(f"📁 Created batch folder: {batch_folder}")
+    else:
+        print(f"📁 Resuming batch folder: {batch_folder}")
+    return batch_folder
+
+def load_manifest(batch_folder, source):
+    """Load the batch manifest, or start a new one."""
+    manifest_path = os.path.join(batch_folder, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {
+        "source": source,
+        "created": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "files": {},
+    }
+
+def save_manifest(batch_folder, manifest):
+    """Write the manifest atomically so a crash never leaves it half-written."""
+    manifest_path = os.path.join(batch_folder, "manifest.json")
+    temp_path = manifest_path + ".tmp"
+    manifest["updated"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, manifest_path)
+
+def _assign_base_names(files, entries):
+    """Give every file a unique output name, keeping names from earlier runs."""
+    used = {entry["base_name"] for entry in entries.values() if "base_name" in entry}
+    for path in files:
+        entry = entries.setdefault(path, {"status": "pending"})
+        if "base_name" in entry:
+            continue
+        stem = os.path.splitext(os.path.basename(path))[0]
+        base_name = stem
+        counter = 2
+        while base_name in used:
+            base_name = f"{stem}_{counter}"
+            counter += 1
+        used.add(base_name)
+        entry["base_name"] = base_name
+
+def process_batch(source, gemini_api_key):
+    """Transcribe and translate every audio file in a folder or glob.
+
+    The Whisper model is loaded once. Files are transcribed one after
+    another while translations run concurrently, fed through a bounded
+    queue. Progress is recorded per file in manifest.json, so rerunning the
+    same command skips finished files and reuses saved transcriptions.
+    """
+    print("\n" + "="*60)
+    print(f"📦 Batch Mode: {source}")
+    print("="*60)
+
+    files = collect_audio_files(source)
+    if not files:
+        print(f"❌ No audio files found for: {source}")
+        print(f"   Supported formats: {', '.join(VALID_EXTENSIONS)}")
+        return False
+
+    config = load_config()
+    target_language = config.get('DEFAULT', 'target_language', fallback='es')
+    workers = max(1, config.getint('DEFAULT', 'translation_workers', fallback=2))
+    queue_size = max(1, config.getint('DEFAULT', 'batch_queue_size', fallback=4))
+    output_dir = config.get('DEFAULT', 'output_folder', fallback='transcriptions')
+
+    batch_folder = create_batch_folder(source, output_dir)
+    manifest = load_manifest(batch_folder, source)
+    entries = manifest["files"]
+    _assign_base_names(files, entries)
+    save_manifest(batch_folder, manifest)
+
+    pending = [path for path in files if entries[path]["status"] != "done"]
+    print(f"🎵 {len(files)} audio files found, {len(files) - len(pending)} already done")
+    if not pending:
+        print("✅ Nothing left to process")
+        return True
+
+    # The Whisper model is loaded on the first cache miss and kept for the batch
+    if not setup_ai_services(gemini_api_key, config):
+        return False
+    model_name = config.get('DEFAULT', 'whisper_model', fallback='small')
+    settings = stream_transcriber.settings_from_config(config)
+    verbose = config.getboolean('DEFAULT', 'verbose', fallback=True)
+    backend = translation_engine.backend_from_config(config, model_name='gemini-pro')
+    translation_settings = translation_engine.settings_from_config(config)
+
+    lock = threading.Lock()
+    work = queue.Queue(maxsize=queue_size)
+
+    def update(path, **fields):
+        with lock:
+            entries[path].update(fields)
+            save_manifest(batch_folder, manifest)
+
+    def translator():
+        while True:
+            item = work.get()
+            if item is None:
+                break
+            path, transcription = item
+            try:
+                translation = translate_text(transcription, target_language, backend, translation_settings)
+                if translation:
+                    translation_file = save_translation(
+                        path, translation, batch_folder, entries[path]["base_name"]
+                    )
+                    update(path, status="done", translation_file=translation_file, error=None)
+                    print(f"🌍 Finished: {os.path.basename(path)}")
+                else:
+                    update(path, status="failed", error="translation failed")
+            except Exception as e:
+                update(path, status="failed", error=str(e))
+
+    job_metrics = metrics.start_job(batch_folder, type='audio_batch', files=len(pending))
+    threads = [threading.Thread(target=metrics.bind(translator), daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for i, path in enumerate(pending, 1):
+            entry = entries[path]
+            print(f"\n📦 [{i}/{len(pending)}] {os.path.basename(path)}")
+
+            transcript_file = entry.get("transcript_file")
+            if entry["status"] in ("transcribed", "failed") and transcript_file and os.path.exists(transcript_file):
+                print(f"♻️  Reusing saved transcription: {transcript_file}")
+                transcription = read_result_body(transcript_file)
+            else:
+                transcription = transcribe_audio(path, model_name, settings, verbose=verbose)
+                if not transcription:
+                    update(path, status="failed", error="transcription failed")
+                    continue
+                transcript_file = save_transcription(path, transcription, batch_folder, entry["base_name"])
+                update(path, status="transcribed", transcript_file=transcript_file)
+
+            # Blocks when translations fall behind, keeping memory bounded
+            work.put((path, transcription))
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted. Finishing queued translations; rerun the same command to resume.")
+    finally:
+        for _ in threads:
+            work.put(None)
+        for thread in threads:
+            thread.join()
+        job_metrics.finish()
+
+    done = sum(1 for path in files if entries[path]["status"] == "done")
+    failed = [path for path in files if entries[path]["status"] == "failed"]
+    print("\n" + "="*60)
+    print(f"📦 Batch summary: {done}/{len(files)} done, {len(failed)} failed")
+    for path in failed:
+        print(f"   ❌ {os.path.basename(path)}: {entries[path].get('error')}")
+    print(f"📁 Output folder: {batch_folder}")
+    print("="*60)
+    return done == len(files)
+
 def show_help():
     """Display help information."""
     print("\n" + "="*60)
@@ -219,20 +442,25 @@ def show_help():
     print()
     print("USAGE:")
     print("  python audio_transcriber.py <audio_file> <gemini_api_key>")
+    print("  python audio_transcriber.py <folder|glob> <gemini_api_key>")
     print("  python audio_transcriber.py --help")
     print()
     print("ARGUMENTS:")
     print("  audio_file    Path to audio file (MP3, M4A, WAV, FLAC, AAC)")
+    print("  folder|glob   Folder or pattern (e.g. \"podcasts/*.mp3\") for batch mode")
     print("  gemini_api_key  Your Google Gemini API key")
     print()
     print("EXAMPLES:")
     print("  python audio_transcriber.py podcast.mp3 YOUR_API_KEY")
     print("  python audio_transcriber.py \"C:\\audio\\episode.m4a\" YOUR_API_KEY")
+    print("  python audio_transcriber.py \"C:\\audio\\podcasts\" YOUR_API_KEY")
     print()
     print("OUTPUT:")
     print("  Creates a timestamped folder in 'transcriptions/' with:")
     print("  - English transcription (.txt)")
     print("  - Spanish translation (.txt)")
+    print("  Batch mode writes to 'transcriptions/batch_<name>/' with a")
+    print("  manifest.json; rerun the same command to resume an interrupted batch.")
     print("="*60)
 
 def main():
@@ -252,15 +480,18 @@ def main():
 
     if len(sys.argv) != 3:
         print("❌ Error: Incorrect number of arguments")
-        print("   Use: python audio_transcriber.py <audio_file> <gemini_api_key>")
+        print("   Use: python audio_transcriber.py <audio_file|folder|glob> <gemini_api_key>")
         print("   Or:  python audio_transcriber.py --help")
         return
 
     audio_path = sys.argv[1]
     gemini_api_key = sys.argv[2]
 
-    # Process the audio file
-    success = process_audio_file(audio_path, gemini_api_key)
+    # Process a whole folder/glob in one run, or a single file
+    if is_batch_source(audio_path):
+        success = process_batch(audio_path, gemini_api_key)
+    else:
+        success = process_audio_file(audio_path, gemini_api_key)
 
     if success:
         print("\n🎉 Audio transcription and translation completed!")
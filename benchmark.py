@@ -0,0 +1,462 @@
+"""
+⏱️ Benchmark - Reproducible offline performance measurements
+
+Generates synthetic fixtures of controlled size (speech-like audio with
+pauses, multi-page text PDFs, English prose), runs each stage and two
+end-to-end jobs against local stand-ins for Gemini, gTTS and yt-dlp with
+configurable latency, and reports per-stage latency and throughput from
+the metrics module. Transcription uses a real Whisper model (tiny by
+default), loaded once before timing.
+
+    python benchmark.py                      # run and compare with the baseline
+    python benchmark.py --save-baseline      # store this run as the baseline
+    python benchmark.py --quick --scenarios translate,tts
+
+Caches are switched off and every run happens in a fresh scratch folder,
+so repeated runs measure the same work. Results go to
+benchmarks/last_run.json; the exit code is 1 when a metric regressed by
+more than the tolerance compared with benchmarks/baseline.json.
+
+Author: IA-ismo LAB
+"""
+
+import argparse
+import configparser
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import types
+import wave
+from datetime import datetime
+
+import numpy as np
+
+import metrics
+
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_USAGE = 2
+
+SCENARIOS = ('transcribe', 'translate', 'tts', 'extract', 'youtube', 'pdf')
+RESULTS_FOLDER = "benchmarks"
+
+# Fixture sizes and repeats for arguments not given on the command line
+DEFAULT_ARGS = {'audio_seconds': 120, 'pdf_pages': 40, 'text_chars': 20000, 'repeat': 3}
+QUICK_ARGS = {'audio_seconds': 30, 'pdf_pages': 8, 'text_chars': 4000, 'repeat': 1}
+
+# Settings shared by every scenario: offline backends, no caches
+BENCHMARK_SETTINGS = {
+    'translation_backend': 'stub',
+    'tts_backend': 'fake',
+    'translation_memory': 'false',
+    'transcript_cache': 'false',
+    'tts_cache': 'false',
+    'pdf_cache': 'false',
+    'media_cache': 'false',
+    'stream_download': 'false',
+    'keep_temp_files': 'false',
+}
+
+# Fields compared with the baseline, and whether a higher value is better
+COMPARED_FIELDS = {
+    'wall_seconds': False,
+    'real_time_factor': False,
+    'latency_p50': False,
+    'latency_p95': False,
+    'chars_in_per_second': True,
+    'pages_per_second': True,
+}
+
+_WORDS = (
+    "the a model audio signal video speech language people time year way day world "
+    "life hand part place case week system program question work government number "
+    "night point home water room mother area money story fact month lot right study "
+    "book eye job word business issue side kind head house service friend father power "
+    "hour game line end member law car city community name president team minute idea "
+    "is was makes takes gives finds tells asks works seems feels tries leaves calls "
+    "new good first last long great little own other old right big high different small "
+    "large next early young important few public bad same able quickly often always"
+).split()
+
+# Fixtures
+
+def synthetic_text(chars, seed=0):
+    """English-like prose of about chars characters, in paragraphs."""
+    rng = np.random.default_rng(seed)
+    paragraphs = []
+    length = 0
+    while length < chars:
+        sentences = []
+        for _ in range(int(rng.integers(3, 7))):
+            words = [_WORDS[i] for i in rng.integers(0, len(_WORDS), int(rng.integers(6, 18)))]
+            sentences.append(" ".join(words).capitalize() + ".")
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[:chars]
+
+def write_speech_wav(path, seconds, seed=0, pause_every=20.0, pause_seconds=3.0):
+    """Write 16 kHz mono speech-like audio: voiced syllables, word gaps and long pauses.
+
+    The pauses exercise silence skipping; the syllables are harmonic tones
+    with a speech-like envelope, so Whisper has to decode every chunk.
+    """
+    rate = 16000
+    rng = np.random.default_rng(seed)
+    audio = np.zeros(int(seconds * rate), dtype=np.float32)
+    cursor = 0.0
+    since_pause = 0.0
+    while cursor < seconds:
+        if since_pause >= pause_every:
+            cursor += pause_seconds
+            since_pause = 0.0
+            continue
+        duration = rng.uniform(0.12, 0.30)
+        start = int(cursor * rate)
+        end = min(len(audio), start + int(duration * rate))
+        t = np.arange(end - start) / rate
+        pitch = rng.uniform(100, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        audio[start:end] += (0.25 * voice * np.hanning(end - start)).astype(np.float32)
+        step = duration + rng.uniform(0.02, 0.08)
+        if rng.random() < 0.3:
+            step += rng.uniform(0.10, 0.25)  # Gap between words
+        cursor += step
+        since_pause += step
+    audio += rng.normal(0, 0.002, len(audio)).astype(np.float32)
+    samples = (np.clip(audio, -1, 1) * 32767).astype('<i2')
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(samples.tobytes())
+    return path
+
+def write_text_pdf(path, pages, lines_per_page=45, seed=0):
+    """Write a PDF of pages pages of different text, using the base Helvetica font."""
+    rng = np.random.default_rng(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for _ in range(pages):
+        lines = []
+        for _ in range(lines_per_page):
+            words = [_WORDS[i] for i in rng.integers(0, len(_WORDS), 12)]
+            lines.append(f"({' '.join(words).capitalize()}.) Tj T*")
+        stream = ("BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(lines) + " ET").encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_number = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number)
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+class StubYoutubeDL:
+    """Local stand-in for yt_dlp.YoutubeDL that 'downloads' a fixture file."""
+
+    source = None
+    latency = 0.0
+
+    def __init__(self, options):
+        self.options = options
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=True):
+        time.sleep(self.latency)
+        info = {'id': 'benchmark01', 'extractor_key': 'Youtube', 'ext': 'wav', 'title': 'Benchmark'}
+        if download:
+            path = self.prepare_filename(info)
+            shutil.copyfile(self.source, path)
+            info['requested_downloads'] = [{'filepath': path}]
+        return info
+
+    def prepare_filename(self, info):
+        return self.options['outtmpl'] % {'ext': info['ext']}
+
+# Running scenarios
+
+def benchmark_config(args):
+    """The ConfigParser used by every scenario."""
+    config = configparser.ConfigParser()
+    config.read_dict({'DEFAULT': dict(
+        BENCHMARK_SETTINGS,
+        whisper_model=args.model,
+        stub_latency_seconds=str(args.api_latency),
+        tts_stub_latency_seconds=str(args.tts_latency),
+    )})
+    return config
+
+@contextlib.contextmanager
+def scratch_folder():
+    """Run the body in a new empty working folder, removed afterwards."""
+    previous = os.getcwd()
+    folder = tempfile.mkdtemp(prefix="castellanator_bench_")
+    os.chdir(folder)
+    try:
+        yield folder
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(folder, ignore_errors=True)
+
+def measure(action, verbose=False):
+    """Run action() once in a scratch folder and return the metrics it recorded."""
+    with scratch_folder():
+        run = metrics.start_job(None)
+        try:
+            if verbose:
+                action()
+            else:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    action()
+        finally:
+            snapshot = run.recorder.snapshot()
+            run.finish()
+    return snapshot
+
+def scenario_actions(args, fixtures, config):
+    """Return {scenario: action} for the selected scenarios."""
+    import pdf_extractor
+    import stream_transcriber
+    import translation_engine
+    import tts_engine
+
+    text = fixtures['text']
+    actions = {
+        'transcribe': lambda: stream_transcriber.transcribe_to_text(
+            fixtures['audio'], model=args.model, device='cpu',
+            settings=stream_transcriber.settings_from_config(config), verbose=False),
+        'translate': lambda: translation_engine.translate_text(
+            text, translation_engine.backend_from_config(config),
+            **translation_engine.settings_from_config(config)),
+        'tts': lambda: tts_engine.synthesize_to_file(
+            text, 'speech.mp3', tts_engine.backend_from_config(config),
+            **tts_engine.settings_from_config(config)),
+        'extract': lambda: pdf_extractor.extract_pages(fixtures['pdf'], cache=False),
+        'youtube': lambda: youtube_job(config),
+        'pdf': lambda: pdf_job(fixtures['pdf'], config),
+    }
+    return {name: actions[name] for name in args.scenarios}
+
+def youtube_job(config):
+    import youtube_audio_processor as processor
+    processor.create_folders()
+    if not processor.process_youtube('benchmark', config, url='https://youtu.be/benchmark01'):
+        raise RuntimeError("YouTube job produced no output")
+
+def pdf_job(pdf_path, config):
+    import youtube_audio_processor as processor
+    processor.create_folders()
+    if not processor.process_pdf('benchmark', config, pdf_path=pdf_path):
+        raise RuntimeError("PDF job produced no output")
+
+def flatten(snapshot):
+    """Reduce a metrics snapshot to the compared {metric_name: value} pairs."""
+    values = {'total.wall_seconds': snapshot['wall_seconds']}
+    for stage, entry in snapshot['stages'].items():
+        for field in COMPARED_FIELDS:
+            if field in entry:
+                values[f"{stage}.{field}"] = entry[field]
+    for provider, entry in snapshot['apis'].items():
+        for field in ('latency_p50', 'latency_p95'):
+            values[f"api_{provider}.{field}"] = entry[field]
+    return values
+
+def median_values(runs):
+    """Median of each metric over the repeated runs."""
+    keys = sorted({key for run in runs for key in run})
+    return {key: round(statistics.median(run[key] for run in runs if key in run), 4) for key in keys}
+
+def run_benchmarks(args):
+    """Build the fixtures, run every scenario args.repeat times and return the results."""
+    fixture_folder = os.path.abspath(os.path.join(RESULTS_FOLDER, "fixtures"))
+    os.makedirs(fixture_folder, exist_ok=True)
+    print(f"🧪 Generating fixtures in {fixture_folder}...")
+    fixtures = {
+        'audio': write_speech_wav(os.path.join(fixture_folder, f"speech_{args.audio_seconds}s.wav"),
+                                  args.audio_seconds),
+        'pdf': write_text_pdf(os.path.join(fixture_folder, f"text_{args.pdf_pages}p.pdf"), args.pdf_pages),
+        'text': synthetic_text(args.text_chars),
+    }
+    config = benchmark_config(args)
+
+    if {'youtube', 'pdf'} & set(args.scenarios):
+        # Stand-in for yt-dlp; the processor module imports it at load time
+        import youtube_audio_processor as processor
+        StubYoutubeDL.source = fixtures['audio']
+        StubYoutubeDL.latency = args.download_latency
+        processor.yt_dlp = types.SimpleNamespace(YoutubeDL=StubYoutubeDL)
+
+    results = {}
+    model_load = None
+    if {'transcribe', 'youtube'} & set(args.scenarios):
+        import model_registry
+        started = time.perf_counter()
+        model_registry.preload_model(args.model, 'cpu')
+        model_load = round(time.perf_counter() - started, 3)
+        print(f"🔥 Whisper '{args.model}' loaded in {model_load:.1f}s (not counted below)")
+
+    for name, action in scenario_actions(args, fixtures, config).items():
+        runs = []
+        for attempt in range(args.repeat):
+            print(f"⏱️  {name} ({attempt + 1}/{args.repeat})...")
+            runs.append(flatten(measure(action, args.verbose)))
+        results[name] = median_values(runs)
+
+    return {
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'parameters': {
+            'model': args.model, 'audio_seconds': args.audio_seconds, 'pdf_pages': args.pdf_pages,
+            'text_chars': args.text_chars, 'api_latency': args.api_latency, 'tts_latency': args.tts_latency,
+            'download_latency': args.download_latency, 'repeat': args.repeat,
+        },
+        'model_load_seconds': model_load,
+        'results': results,
+    }
+
+# Reporting
+
+def compare(results, baseline, tolerance):
+    """Return (rows, regressions) comparing results with a baseline run.
+
+    Each row is (scenario, metric, value, baseline value or None, relative change or None).
+    Timings below 5 ms are reported but never flagged, as they are mostly noise.
+    """
+    rows = []
+    regressions = []
+    for scenario, values in results['results'].items():
+        base_values = (baseline or {}).get('results', {}).get(scenario, {})
+        for metric, value in values.items():
+            base = base_values.get(metric)
+            change = None
+            if base:
+                change = (value - base) / base
+                higher_is_better = COMPARED_FIELDS.get(metric.split('.')[-1], False)
+                worse = -change if higher_is_better else change
+                noise = not higher_is_better and max(value, base) < 0.005
+                if worse > tolerance and not noise:
+                    regressions.append((scenario, metric, value, base, change))
+            rows.append((scenario, metric, value, base, change))
+    return rows, regressions
+
+def print_report(rows, show_hint):
+    print(f"\n{'scenario':<11} {'metric':<34} {'value':>12} {'baseline':>12} {'change':>9}")
+    print("-" * 82)
+    for scenario, metric, value, base, change in rows:
+        base_text = f"{base:12.4f}" if base is not None else f"{'-':>12}"
+        change_text = f"{change:+8.1%}" if change is not None else f"{'':>9}"
+        print(f"{scenario:<11} {metric:<34} {value:12.4f} {base_text} {change_text}")
+    if show_hint:
+        print("\nℹ️  No baseline yet: run with --save-baseline to store one")
+
+def check_parameters(results, baseline):
+    """Warn when the baseline was measured with other fixtures or latencies."""
+    if baseline and baseline.get('parameters') != results['parameters']:
+        print("⚠️  Baseline was recorded with different parameters; the comparison is not like for like")
+        print(f"   baseline: {baseline.get('parameters')}")
+        print(f"   this run: {results['parameters']}")
+
+def write_json(path, data):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark Castellanator offline with synthetic fixtures.")
+    parser.add_argument('--scenarios', default=",".join(SCENARIOS),
+                        help=f"comma separated, from: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--model', default='tiny', help="Whisper model (default: tiny)")
+    parser.add_argument('--audio-seconds', type=int, help="length of the synthetic audio (default: 120)")
+    parser.add_argument('--pdf-pages', type=int, help="pages in the synthetic PDF (default: 40)")
+    parser.add_argument('--text-chars', type=int, help="characters to translate and voice (default: 20000)")
+    parser.add_argument('--api-latency', type=float, default=0.05, help="stub Gemini latency in seconds (default: 0.05)")
+    parser.add_argument('--tts-latency', type=float, default=0.05, help="stub TTS latency in seconds (default: 0.05)")
+    parser.add_argument('--download-latency', type=float, default=0.5,
+                        help="stub yt-dlp latency in seconds (default: 0.5)")
+    parser.add_argument('--repeat', type=int, help="runs per scenario; the median is reported (default: 3)")
+    parser.add_argument('--quick', action='store_true', help="small fixtures and a single run, for a smoke check")
+    parser.add_argument('--baseline', default=os.path.join(RESULTS_FOLDER, "baseline.json"),
+                        help="baseline to compare with (default: benchmarks/baseline.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="relative slowdown reported as a regression (default: 0.15)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="show the output of the stages")
+    args = parser.parse_args(argv)
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    # --quick only shrinks what was not given, so --quick --repeat 3 still repeats
+    for name, value in (QUICK_ARGS if args.quick else DEFAULT_ARGS).items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+    return args
+
+def main(argv=None):
+    """Entry point; returns the process exit code."""
+    args = parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown or not args.scenarios or args.repeat < 1:
+        print(f"❌ Unknown scenarios {unknown}; choose from {', '.join(SCENARIOS)}" if unknown
+              else "❌ Nothing to run")
+        return EXIT_USAGE
+
+    results = run_benchmarks(args)
+    write_json(os.path.join(RESULTS_FOLDER, "last_run.json"), results)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        check_parameters(results, baseline)
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print_report(rows, baseline is None and not args.save_baseline)
+
+    if args.save_baseline:
+        write_json(args.baseline, results)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return EXIT_OK
+    if regressions:
+        print(f"\n❌ {len(regressions)} metrics regressed by more than {args.tolerance:.0%}:")
+        for scenario, metric, value, base, change in regressions:
+            print(f"   {scenario} {metric}: {base:.4f} -> {value:.4f} ({change:+.1%})")
+        return EXIT_REGRESSION
+    if baseline:
+        print("\n✅ No regressions")
+    return EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+💾 Checkpoint - Stage-level progress records inside a job folder
+
+Every stage of a job (download, transcription, translation, speech)
+records its status, a hash of its inputs and the files it produced in
+checkpoint.json. When the job is resumed a stage whose inputs are
+unchanged and whose files still exist is skipped and its files are
+reused, so a crash late in a long job only costs the unfinished stages.
+
+Author: IA-ismo LAB
+"""
+
+import json
+import os
+from datetime import datetime
+
+from disk_cache import file_digest, make_key
+
+FILENAME = "checkpoint.json"
+
+def inputs_key(*parts):
+    """Hash the inputs of a stage (settings, source URL, upstream digests)."""
+    return make_key("stage", *parts)
+
+def file_key(path):
+    """Digest of an input file, for use in inputs_key."""
+    return file_digest(path)
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def load(process_folder):
+    """Return the checkpoint data of a folder, or None if there is none."""
+    path = os.path.join(process_folder, FILENAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class Checkpoint:
+    """checkpoint.json of one job folder."""
+
+    def __init__(self, process_folder, job=None):
+        self.folder = process_folder
+        self.path = os.path.join(process_folder, FILENAME)
+        self.data = load(process_folder) or {'created': _now(), 'stages': {}}
+        if job is not None:
+            self.data['job'] = job
+            self.save()
+
+    def save(self):
+        """Write the checkpoint atomically."""
+        self.data['updated'] = _now()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def _set(self, stage, **fields):
+        self.data['stages'].setdefault(stage, {}).update(fields)
+        self.save()
+
+    def finished(self, stage, inputs):
+        """Return the outputs of a completed stage if they can be reused."""
+        record = self.data['stages'].get(stage)
+        if not record or record.get('status') != 'done' or record.get('inputs') != inputs:
+            return None
+        outputs = record.get('outputs', {})
+        if not all(os.path.exists(path) for path in outputs.values() if isinstance(path, str)):
+            return None
+        return outputs
+
+    def begin(self, stage, inputs):
+        """Mark a stage as running."""
+        self._set(stage, status='running', inputs=inputs, started=_now(), error=None)
+
+    def complete(self, stage, inputs, outputs):
+        """Mark a stage as done with the files it produced."""
+        self._set(stage, status='done', inputs=inputs, outputs=outputs, finished=_now())
+
+    def fail(self, stage, error):
+        """Mark a stage as failed."""
+        self._set(stage, status='failed', error=f"{type(error).__name__}: {error}", finished=_now())
+
+    def run(self, stage, inputs, action):
+        """Run action() unless the stage is already done; return its outputs.
+
+        action returns a dict of output paths.
+        """
+        outputs = self.finished(stage, inputs)
+        if outputs is not None:
+            print(f"♻️  Stage '{stage}' already done, reusing its output")
+            return outputs
+        self.begin(stage, inputs)
+        try:
+            outputs = action()
+        except BaseException as e:
+            self.fail(stage, e)
+            raise
+        self.complete(stage, inputs, outputs)
+        return outputs
+
+    def track(self, stage, inputs, items, outputs):
+        """Yield from items and mark the stage done once they are exhausted.
+
+        For stages that stream into the next one, such as transcription
+        feeding the translation pipeline. If the consumer closes the
+        generator early the stage is recorded as interrupted, not failed:
+        nothing went wrong in it, it just did not get to finish.
+        """
+        self.begin(stage, inputs)
+        try:
+            yield from items
+        except GeneratorExit:
+            self._set(stage, status='interrupted', finished=_now())
+            raise
+        except BaseException as e:
+            self.fail(stage, e)
+            raise
+        self.complete(stage, inputs, outputs)
+
+    def mark_job(self, status):
+        """Record the status of the whole job (running, done or failed)."""
+        self.data['status'] = status
+        self.save()
@@ -0,0 +1,111 @@
+"""
+⚡ Chunk Transcriber - Spread long audio over several Whisper workers
+
+Each worker process keeps its own warm Whisper model (through the model
+registry) and transcribes whole chunks. The worker pools outlive a single
+call, one per (model, device, workers), so later files skip process start
+and model loading; they are shut down at exit. Results always come back
+in chunk order so the transcript can be stitched together directly.
+
+Author: IA-ismo LAB
+"""
+
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import audio_decode
+import model_registry
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _init_worker(model_name, device, threads):
+    """Limit torch threads and warm the model once per worker process."""
+    import torch
+    torch.set_num_threads(threads)
+    model_registry.preload_model(model_name, device)
+
+def _transcribe_chunk(job):
+    """Transcribe one chunk inside a worker process."""
+    chunk, model_name, device, options = job
+    chunk = audio_decode.resolve_chunk(chunk)
+    with model_registry.use_model(model_name, device) as model:
+        return model.transcribe(chunk, **options)
+
+def _get_pool(model_name, device, workers):
+    """Return the running pool for these settings, starting it if needed."""
+    key = (model_name, device, workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            # Split the cores between workers so torch does not oversubscribe them
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            print(f"Starting {workers} Whisper workers ({threads} threads each)...")
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(model_name, device, threads))
+            _pools[key] = pool
+        return pool
+
+def _discard_pool(pool):
+    """Forget a pool whose workers died, so the next call starts a new one."""
+    with _pools_lock:
+        for key, known in list(_pools.items()):
+            if known is pool:
+                del _pools[key]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_pools():
+    """Stop every worker pool (also registered to run at exit)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+atexit.register(shutdown_pools)
+
+def iter_transcribe_chunks(chunks, model_name='small', device='cpu', workers=1, options=None):
+    """Yield Whisper results in chunk order as soon as each one is ready.
+
+    Chunks may be file paths, sample arrays or audio_decode.PcmRef slices.
+    """
+    options = dict(options or {})
+    options.setdefault('verbose', False)
+    total = len(chunks)
+    if total == 0:
+        return
+    workers = max(1, int(workers))
+
+    if min(workers, total) == 1:
+        with model_registry.use_model(model_name, device) as model:
+            for i, chunk in enumerate(chunks):
+                print(f"Transcribing chunk {i+1}/{total}...")
+                result = model.transcribe(audio_decode.resolve_chunk(chunk), **options)
+                # Detect the language once and reuse it for the remaining chunks
+                if not options.get('language') and result.get('language'):
+                    options['language'] = result['language']
+                yield result
+        return
+
+    pool = _get_pool(model_name, device, workers)
+    print(f"Transcribing {total} chunks with {min(workers, total)} workers...")
+    futures = [pool.submit(_transcribe_chunk, (chunk, model_name, device, options)) for chunk in chunks]
+    try:
+        for i, future in enumerate(futures):
+            result = future.result()
+            print(f"Chunk {i+1}/{total} transcribed.")
+            yield result
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        # The pool stays up for the next file; drop this call's unstarted chunks
+        for future in futures:
+            future.cancel()
+
+def transcribe_chunks(chunks, model_name='small', device='cpu', workers=1, options=None):
+    """Transcribe chunks and return the Whisper results in chunk order."""
+    return list(iter_transcribe_chunks(chunks, model_name, device, workers, options))
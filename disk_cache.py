@@ -0,0 +1,111 @@
+"""
+🗄️ Disk Cache - Content-addressed on-disk cache with LRU eviction
+
+Entries are files named after their key. A hit refreshes the file's
+modification time, and when the cache grows past its size limit the
+least recently used entries are deleted first.
+
+Author: IA-ismo LAB
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+CACHE_ROOT = "cache"
+
+def file_digest(path, block_size=1024 * 1024):
+    """Return the SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def make_key(*parts):
+    """Build a stable cache key from JSON-serialisable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class DiskCache:
+    """Size-bounded cache of byte blobs stored as files."""
+
+    def __init__(self, directory, max_bytes, suffix=".bin"):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._size = None  # Bytes on disk as of the last scan, plus writes since
+
+    def path_for(self, key):
+        """Return the file that holds (or would hold) a key."""
+        return os.path.join(self.directory, key[:2], key + self.suffix)
+
+    def get(self, key):
+        """Return the cached bytes for key, or None on a miss."""
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, data):
+        """Store bytes under key and evict old entries if over the limit."""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data)
+            # Only rescan the folder once the running total may be over the limit
+            over = self._size is None or self._size > self.max_bytes
+        if over:
+            self.evict()
+        return path
+
+    def entries(self):
+        """List (mtime, size, path) for every entry in the cache."""
+        found = []
+        if not os.path.exists(self.directory):
+            return found
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(self.suffix):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, stat.st_size, path))
+        return found
+
+    def evict(self):
+        """Delete least recently used entries until under max_bytes."""
+        if self.max_bytes <= 0:
+            return 0
+        with self._lock:
+            found = self.entries()
+            total = sum(size for _, size, _ in found)
+            removed = 0
+            for _, size, path in sorted(found):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._size = total
+            return removed
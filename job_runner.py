@@ -0,0 +1,170 @@
+"""
+🏭 Job Runner - Headless batch processing for Castellanator
+
+Reads a JSONL manifest with one job per line and runs the jobs on a pool
+of workers, without any prompts:
+
+    {"id": "talk-1", "url": "https://youtu.be/...", "target_language": "es"}
+    {"id": "book-1", "pdf": "pdf/book.pdf", "model": "small"}
+
+Each finished job is appended to a results manifest (JSONL) with its
+status, output files, error and duration. The exit code is 0 when every
+job succeeded, 1 when some failed and 2 when the manifest or arguments are
+invalid.
+
+Author: IA-ismo LAB
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import model_registry
+import youtube_audio_processor as processor
+
+EXIT_OK = 0
+EXIT_FAILED_JOBS = 1
+EXIT_USAGE = 2
+
+# Manifest fields that override a config.ini key for one job
+JOB_OVERRIDES = {
+    'target_language': 'target_language',
+    'model': 'whisper_model',
+}
+
+def load_jobs(manifest_path):
+    """Read and validate the jobs in a JSONL manifest.
+
+    Raises ValueError describing the first invalid line.
+    """
+    jobs = []
+    seen = set()
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {line_number}: invalid JSON ({e})")
+            if not isinstance(job, dict):
+                raise ValueError(f"line {line_number}: a job must be a JSON object")
+            if 'type' not in job:
+                job['type'] = 'pdf' if 'pdf' in job else 'youtube'
+            if job['type'] == 'youtube' and not job.get('url'):
+                raise ValueError(f"line {line_number}: YouTube jobs need a 'url'")
+            if job['type'] == 'pdf' and not job.get('pdf'):
+                raise ValueError(f"line {line_number}: PDF jobs need a 'pdf' path")
+            if job['type'] not in ('youtube', 'pdf'):
+                raise ValueError(f"line {line_number}: unknown job type '{job['type']}'")
+            job.setdefault('id', f"job-{line_number}")
+            if job['id'] in seen:
+                raise ValueError(f"line {line_number}: duplicate job id '{job['id']}'")
+            seen.add(job['id'])
+            jobs.append(job)
+    return jobs
+
+def config_for_job(config, job):
+    """Copy the shared config and apply the job's overrides."""
+    job_config = processor.copy_config(config)
+    for field, key in JOB_OVERRIDES.items():
+        if job.get(field):
+            job_config.set('DEFAULT', key, str(job[field]))
+    return job_config
+
+def run_job(job, api_key, config):
+    """Run one job and return its result record."""
+    started = time.monotonic()
+    record = {
+        'id': job['id'],
+        'type': job['type'],
+        'source': job.get('url') or job.get('pdf'),
+        'started': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    try:
+        job_config = config_for_job(config, job)
+        if job['type'] == 'youtube':
+            outputs = processor.process_youtube(api_key, job_config, url=job['url'])
+        else:
+            if not os.path.exists(job['pdf']):
+                raise FileNotFoundError(f"PDF not found: {job['pdf']}")
+            outputs = processor.process_pdf(api_key, job_config, pdf_path=job['pdf'])
+        if not outputs:
+            raise RuntimeError("job produced no output")
+        record['status'] = 'ok'
+        record['outputs'] = outputs
+    except Exception as e:
+        record['status'] = 'failed'
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = round(time.monotonic() - started, 2)
+    return record
+
+def run_jobs(jobs, api_key, config, workers=1, results_path=None):
+    """Run jobs on a worker pool; return the result records in manifest order."""
+    records = {}
+    results_file = open(results_path, 'w', encoding='utf-8') if results_path else None
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(run_job, job, api_key, config): job for job in jobs}
+            for future in as_completed(futures):
+                record = future.result()
+                records[record['id']] = record
+                # One line per job as soon as it ends, so a crash keeps the finished ones
+                if results_file:
+                    results_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    results_file.flush()
+                done = len(records)
+                icon = "✅" if record['status'] == 'ok' else "❌"
+                print(f"{icon} [{done}/{len(jobs)}] {record['id']}: {record['status']} "
+                      f"({record['seconds']:.1f}s){' - ' + record['error'] if 'error' in record else ''}")
+                # Keep memory in check between jobs on long runs
+                model_registry.release_idle_models()
+    finally:
+        if results_file:
+            results_file.close()
+    return [records[job['id']] for job in jobs]
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(
+        description="Run Castellanator jobs from a JSONL manifest without prompts.")
+    parser.add_argument('manifest', help="JSONL file with one job per line")
+    parser.add_argument('-o', '--results', help="results JSONL (default: <manifest>.results.jsonl)")
+    parser.add_argument('-w', '--workers', type=int, default=1, help="jobs run at the same time (default: 1)")
+    parser.add_argument('-c', '--config', default='config.ini', help="settings file (default: config.ini)")
+    parser.add_argument('--api-key', default=os.environ.get('GEMINI_API_KEY'),
+                        help="Gemini API key (default: $GEMINI_API_KEY)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Entry point; returns the process exit code."""
+    args = parse_args(argv)
+    if not args.api_key:
+        print("❌ No API key: pass --api-key or set GEMINI_API_KEY")
+        return EXIT_USAGE
+    try:
+        jobs = load_jobs(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid manifest {args.manifest}: {e}")
+        return EXIT_USAGE
+    if not jobs:
+        print(f"⚠️  No jobs in {args.manifest}")
+        return EXIT_OK
+
+    config = processor.load_config(args.config)
+    processor.create_folders()
+    results_path = args.results or os.path.splitext(args.manifest)[0] + ".results.jsonl"
+    print(f"🏭 Running {len(jobs)} jobs with {args.workers} workers, results in {results_path}")
+
+    records = run_jobs(jobs, args.api_key, config, args.workers, results_path)
+    failed = [r for r in records if r['status'] != 'ok']
+    print(f"\n🏁 {len(records) - len(failed)}/{len(records)} jobs succeeded")
+    return EXIT_FAILED_JOBS if failed else EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
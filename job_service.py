@@ -0,0 +1,366 @@
+"""
+🛰️ Job Service - Local HTTP service that keeps Castellanator warm
+
+A long-running process that accepts jobs over HTTP, so callers do not
+pay for importing torch and loading Whisper on every request:
+
+    POST /jobs                      {"type": "youtube", "url": "..."}
+                                    {"type": "pdf", "pdf": "pdf/book.pdf"}
+                                    {"type": "audio", "audio": "talk.mp3"}
+    GET  /jobs                      all jobs
+    GET  /jobs/<id>                 status of one job
+    GET  /jobs/<id>/artifacts       files written by the job
+    GET  /jobs/<id>/artifacts/<f>   download one file
+    GET  /health                    queue depth, pool sizes, loaded models
+    GET  /metrics                   stage and API totals (Prometheus text)
+
+Each job is split into steps that run on two bounded pools: CPU-bound
+work (Whisper, PDF parsing) on the CPU pool and network-bound work
+(downloads, Gemini, TTS) on the network pool. Steps hand over through the
+job folder's checkpoint, so the wrapped process_youtube / process_pdf /
+process_audio_file calls reuse what the earlier steps produced. New jobs
+are refused with 429 once too many are waiting.
+
+Author: IA-ismo LAB
+"""
+
+import argparse
+import json
+import mimetypes
+import os
+import sys
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import checkpoint
+import job_runner
+import metrics
+import model_registry
+import pdf_extractor
+import youtube_audio_processor as processor
+
+DEFAULT_PORT = 8765
+JOB_TYPES = ('youtube', 'pdf', 'audio')
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+class JobService:
+    """Job queue with separate CPU and network pools and admission control."""
+
+    def __init__(self, api_key, config, cpu_workers=1, net_workers=4, max_pending=20):
+        self.api_key = api_key
+        self.config = config
+        self.max_pending = max_pending
+        self.cpu_workers = cpu_workers
+        self.net_workers = net_workers
+        self.cpu_pool = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="cpu")
+        self.net_pool = ThreadPoolExecutor(max_workers=net_workers, thread_name_prefix="net")
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    # Job bookkeeping
+
+    def _update(self, job, **fields):
+        with self._lock:
+            job.update(fields)
+
+    def public(self, job):
+        """The fields of a job that are reported over HTTP."""
+        with self._lock:
+            return {k: v for k, v in job.items() if not k.startswith('_')}
+
+    def submit(self, request):
+        """Validate and queue a job; return (http_status, body)."""
+        job_type = request.get('type') or ('pdf' if 'pdf' in request else 'audio' if 'audio' in request else 'youtube')
+        source = request.get({'youtube': 'url', 'pdf': 'pdf', 'audio': 'audio'}.get(job_type, 'url'))
+        if job_type not in JOB_TYPES:
+            return 400, {'error': f"unknown job type '{job_type}'"}
+        if not source:
+            return 400, {'error': f"{job_type} jobs need a '{'url' if job_type == 'youtube' else job_type}' field"}
+        if job_type != 'youtube' and not os.path.exists(source):
+            return 400, {'error': f"file not found: {source}"}
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            'id': job_id, 'type': job_type, 'source': source, 'status': 'queued', 'step': None,
+            'submitted': _now(), 'outputs': None, 'error': None,
+            '_request': request,
+        }
+        with self._lock:
+            # Checked under the lock so concurrent submissions can't overshoot the limit
+            pending = sum(1 for other in self.jobs.values() if other['status'] in ('queued', 'running'))
+            if pending >= self.max_pending:
+                return 429, {'error': "too many pending jobs, retry later"}
+            self.jobs[job_id] = job
+        steps = getattr(self, f"_{job_type}_steps")(job)
+        self._run_steps(job, steps)
+        return 202, self.public(job)
+
+    def _run_steps(self, job, steps):
+        """Run (pool, name, fn) steps one after another on their pools."""
+        if not steps:
+            self._update(job, status='done', step=None, finished=_now())
+            return
+        pool, name, fn = steps[0]
+
+        def step():
+            self._update(job, status='running', step=name)
+            try:
+                fn()
+            except Exception as e:
+                traceback.print_exc()
+                self._update(job, status='failed', error=f"{type(e).__name__}: {e}", finished=_now())
+                return
+            self._run_steps(job, steps[1:])
+
+        (self.cpu_pool if pool == 'cpu' else self.net_pool).submit(step)
+
+    def _job_config(self, job):
+        job_config = job_runner.config_for_job(self.config, job['_request'])
+        # The service schedules download and transcription itself
+        job_config.set('DEFAULT', 'stream_download', 'false')
+        return job_config
+
+    def _finish(self, job, outputs):
+        if not outputs:
+            raise RuntimeError("job produced no output")
+        self._update(job, outputs=outputs, folder=outputs.get('folder'))
+
+    # Steps per job type
+
+    def _youtube_steps(self, job):
+        config = self._job_config(job)
+        url = job['source']
+        state = {}
+
+        def download():
+            folder = processor.create_process_folder()
+            self._update(job, folder=folder)
+            state['stages'] = checkpoint.Checkpoint(folder, job={
+                'type': 'youtube', 'url': url,
+                'target_language': config.get('DEFAULT', 'target_language', fallback='es'),
+                'model': config.get('DEFAULT', 'whisper_model', fallback='small'),
+            })
+            state['folder'] = folder
+            with metrics.job(folder, type='youtube', step='download'):
+                state['audio'] = processor.download_stage(state['stages'], url, folder, config)
+
+        def transcribe():
+            with metrics.job(state['folder'], type='youtube', step='transcribe'):
+                processor.transcribe_stage(state['stages'], state['audio'],
+                                           os.path.join(state['folder'], 'transcript.txt'), config)
+
+        def translate_and_speak():
+            # Download and transcription are reused from the checkpoint
+            self._finish(job, processor.process_youtube(self.api_key, config, url=url,
+                                                        process_folder=state['folder']))
+
+        return [('net', 'download', download), ('cpu', 'transcribe', transcribe),
+                ('net', 'translate_tts', translate_and_speak)]
+
+    def _pdf_steps(self, job):
+        config = self._job_config(job)
+        pdf_path = job['source']
+
+        def extract():
+            # Fills the page cache, so the extraction inside process_pdf is a hit
+            if config.getboolean('DEFAULT', 'pdf_cache', fallback=True):
+                pdf_extractor.extract_text(pdf_path, config.getint('DEFAULT', 'pdf_workers', fallback=0) or None)
+
+        def translate_and_speak():
+            self._finish(job, processor.process_pdf(self.api_key, config, pdf_path=pdf_path))
+
+        return [('cpu', 'extract', extract), ('net', 'translate_tts', translate_and_speak)]
+
+    def _audio_steps(self, job):
+        import audio_transcriber
+        audio_path = job['source']
+        config = self._job_config(job)
+
+        def transcribe():
+            # Fills the transcript cache with the same key process_audio_file uses
+            audio_transcriber.transcribe_audio(
+                audio_path, config.get('DEFAULT', 'whisper_model', fallback='small'),
+                audio_transcriber.stream_transcriber.settings_from_config(config), verbose=False,
+            )
+
+        def translate():
+            folder = audio_transcriber.process_audio_file(audio_path, self.api_key, config)
+            self._finish(job, {'folder': folder} if folder else None)
+
+        return [('cpu', 'transcribe', transcribe), ('net', 'translate', translate)]
+
+    # Reporting
+
+    def artifacts(self, job):
+        """List the files in a job's folder."""
+        folder = job.get('folder')
+        if not folder or not os.path.isdir(folder):
+            return []
+        found = []
+        for root, _, names in os.walk(folder):
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                found.append({'name': os.path.relpath(path, folder).replace(os.sep, '/'),
+                              'bytes': os.path.getsize(path)})
+        return found
+
+    def artifact_path(self, job, name):
+        """Resolve an artifact name inside the job folder, or None."""
+        folder = job.get('folder')
+        if not folder:
+            return None
+        root = os.path.realpath(folder)
+        path = os.path.realpath(os.path.join(root, name))
+        if not path.startswith(root + os.sep) or not os.path.isfile(path):
+            return None
+        return path
+
+    def health(self):
+        """Queue depth, pool sizes and loaded models."""
+        with self._lock:
+            statuses = [job['status'] for job in self.jobs.values()]
+        return {
+            'queued': statuses.count('queued'),
+            'running': statuses.count('running'),
+            'done': statuses.count('done'),
+            'failed': statuses.count('failed'),
+            'max_pending': self.max_pending,
+            'cpu_workers': self.cpu_workers,
+            'net_workers': self.net_workers,
+            'models': [f"{name}@{device}" for name, device in model_registry.loaded_models()],
+        }
+
+def make_handler(service):
+    """Build the request handler class bound to a JobService."""
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "Castellanator/1.0"
+
+        def _send_json(self, status, body):
+            data = json.dumps(body, ensure_ascii=False, indent=2).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            if status == 429:
+                self.send_header('Retry-After', '30')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_text(self, text):
+            data = text.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _job(self, job_id):
+            job = service.jobs.get(job_id)
+            if job is None:
+                self._send_json(404, {'error': f"no job {job_id}"})
+            return job
+
+        def do_GET(self):
+            parts = [p for p in self.path.split('?')[0].split('/') if p]
+            if parts == ['health']:
+                return self._send_json(200, service.health())
+            if parts == ['metrics']:
+                return self._send_text(metrics.prometheus_text())
+            if parts == ['jobs']:
+                return self._send_json(200, [service.public(job) for job in list(service.jobs.values())])
+            if len(parts) >= 2 and parts[0] == 'jobs':
+                job = self._job(parts[1])
+                if job is None:
+                    return None
+                if len(parts) == 2:
+                    return self._send_json(200, service.public(job))
+                if len(parts) == 3 and parts[2] == 'artifacts':
+                    return self._send_json(200, service.artifacts(job))
+                if len(parts) > 3 and parts[2] == 'artifacts':
+                    return self._send_file(service.artifact_path(job, "/".join(parts[3:])))
+            return self._send_json(404, {'error': "not found"})
+
+        def _send_file(self, path):
+            if path is None:
+                return self._send_json(404, {'error': "no such artifact"})
+            self.send_response(200)
+            self.send_header('Content-Type', mimetypes.guess_type(path)[0] or 'application/octet-stream')
+            self.send_header('Content-Length', str(os.path.getsize(path)))
+            self.end_headers()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    self.wfile.write(block)
+            return None
+
+        def do_POST(self):
+            if self.path.split('?')[0].rstrip('/') != '/jobs':
+                return self._send_json(404, {'error': "not found"})
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(request, dict):
+                    raise ValueError("body must be a JSON object")
+            except ValueError as e:
+                return self._send_json(400, {'error': f"invalid JSON: {e}"})
+            status, body = service.submit(request)
+            return self._send_json(status, body)
+
+        def log_message(self, format, *args):
+            print(f"🌐 {self.address_string()} {format % args}")
+
+    return Handler
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description="Run Castellanator as a local HTTP job service.")
+    parser.add_argument('-c', '--config', default='config.ini', help="settings file (default: config.ini)")
+    parser.add_argument('--host', help="address to listen on (default: service_host or 127.0.0.1)")
+    parser.add_argument('--port', type=int, help=f"port (default: service_port or {DEFAULT_PORT})")
+    parser.add_argument('--api-key', default=os.environ.get('GEMINI_API_KEY'),
+                        help="Gemini API key (default: $GEMINI_API_KEY)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Start the service and serve until interrupted."""
+    args = parse_args(argv)
+    if not args.api_key:
+        print("❌ No API key: pass --api-key or set GEMINI_API_KEY")
+        return job_runner.EXIT_USAGE
+
+    config = processor.load_config(args.config)
+    processor.create_folders()
+    metrics.configure(**metrics.settings_from_config(config))
+    host = args.host or config.get('DEFAULT', 'service_host', fallback='127.0.0.1')
+    port = args.port or config.getint('DEFAULT', 'service_port', fallback=DEFAULT_PORT)
+
+    # Keep models loaded between jobs, and load the default one now
+    model_registry.set_idle_timeout(config.getfloat('DEFAULT', 'service_model_idle_minutes', fallback=60) * 60)
+    model_name = config.get('DEFAULT', 'whisper_model', fallback='small')
+    print(f"🔥 Warming Whisper model '{model_name}'...")
+    model_registry.preload_model(model_name, 'cpu')
+
+    service = JobService(
+        args.api_key, config,
+        cpu_workers=config.getint('DEFAULT', 'service_cpu_workers', fallback=1),
+        net_workers=config.getint('DEFAULT', 'service_net_workers', fallback=4),
+        max_pending=config.getint('DEFAULT', 'service_max_pending', fallback=20),
+    )
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"🛰️  Castellanator job service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping job service")
+    finally:
+        server.server_close()
+        service.cpu_pool.shutdown(wait=False, cancel_futures=True)
+        service.net_pool.shutdown(wait=False, cancel_futures=True)
+    return job_runner.EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
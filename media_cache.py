@@ -0,0 +1,144 @@
+"""
+🎞️ Media Cache - Download each video's audio once
+
+Downloaded audio is kept in cache/media, keyed by the extractor, the
+video ID and the download format. Short links, timestamped links and
+playlist links to the same video resolve to the same entry, and a hit is
+hardlinked into the job folder, so re-processing a video with another
+model or prompt costs no network or download time.
+
+Author: IA-ismo LAB
+"""
+
+import os
+import re
+import shutil
+import threading
+from urllib.parse import parse_qs, urlparse
+
+from disk_cache import CACHE_ROOT, DiskCache, make_key
+
+DEFAULT_MAX_MB = 10240
+
+_YOUTUBE_HOSTS = {'youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtube-nocookie.com'}
+_YOUTUBE_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+_cache = DiskCache(os.path.join(CACHE_ROOT, "media"), DEFAULT_MAX_MB * 1024 * 1024, suffix=".media")
+# Held while an entry is linked into a job, so eviction can't delete it in between
+_lock = threading.Lock()
+
+def configure(max_mb=DEFAULT_MAX_MB, directory=None):
+    """Set the size limit (and optionally the folder) of the cache."""
+    _cache.max_bytes = int(float(max_mb) * 1024 * 1024)
+    if directory:
+        _cache.directory = directory
+
+def youtube_id(url):
+    """Read the video ID from the common YouTube URL forms, offline."""
+    parsed = urlparse(url if '://' in url else 'https://' + url)
+    host = (parsed.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    candidate = None
+    if host == 'youtu.be':
+        candidate = parsed.path.strip('/').split('/')[0]
+    elif host in _YOUTUBE_HOSTS:
+        parts = parsed.path.strip('/').split('/')
+        if parts[0] == 'watch':
+            candidate = parse_qs(parsed.query).get('v', [None])[0]
+        elif parts[0] in ('shorts', 'embed', 'live', 'v') and len(parts) > 1:
+            candidate = parts[1]
+    if candidate and _YOUTUBE_ID.match(candidate):
+        return candidate
+    return None
+
+def video_key(url):
+    """Return (extractor, video_id) for a URL.
+
+    YouTube links are parsed locally; anything else asks yt-dlp, which
+    costs a metadata request but no download.
+    """
+    video_id = youtube_id(url)
+    if video_id:
+        return 'Youtube', video_id
+    import yt_dlp
+    with yt_dlp.YoutubeDL({'quiet': True, 'noplaylist': True}) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return info.get('extractor_key') or info.get('extractor', 'generic'), info['id']
+
+def format_label(audio_format, quality=None):
+    """Name the download format as it is stored in the cache."""
+    return f"mp3-{quality}" if audio_format == 'mp3' else audio_format
+
+def _path(key, fmt):
+    extractor, video_id = key
+    return _cache.path_for(make_key("media", extractor, video_id, fmt))
+
+def lookup(key, fmt):
+    """Return the cached audio file for a video, or None."""
+    path = _path(key, fmt)
+    if not os.path.exists(path):
+        return None
+    try:
+        os.utime(path)  # Mark as recently used
+    except OSError:
+        pass
+    return path
+
+def store(downloaded_path, key, fmt):
+    """Move a finished download into the cache and return its new path."""
+    path = _path(key, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(downloaded_path, path)
+    # yt-dlp dates files by their upload time; a new entry is the most recently used
+    os.utime(path)
+    return path
+
+def staging_base(key, fmt):
+    """Base path (without extension) to download a video into the cache."""
+    path = _path(key, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path[:-len(_cache.suffix)] + f".{os.getpid()}.download"
+
+def sniff_extension(path):
+    """Guess an audio file's extension from its first bytes."""
+    with open(path, 'rb') as f:
+        head = f.read(12)
+    if head.startswith(b'\x1a\x45\xdf\xa3'):
+        return '.webm'
+    if head[4:8] == b'ftyp':
+        return '.m4a'
+    if head.startswith(b'OggS'):
+        return '.ogg'
+    if head.startswith(b'ID3') or head[:1] == b'\xff':
+        return '.mp3'
+    if head.startswith(b'RIFF'):
+        return '.wav'
+    return '.audio'
+
+def link_into(cached_path, job_base):
+    """Hardlink cached audio to job_base + extension; copy only if linking fails."""
+    target = job_base + sniff_extension(cached_path)
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(cached_path, target)
+    except OSError:
+        shutil.copy2(cached_path, target)
+    return target
+
+def link_cached(key, fmt, job_base):
+    """Link a cached video into job_base + extension; return the path, or None on a miss."""
+    with _lock:
+        cached = lookup(key, fmt)
+        return link_into(cached, job_base) if cached else None
+
+def store_and_link(downloaded_path, key, fmt, job_base):
+    """Store a finished download and link it into job_base + extension."""
+    with _lock:
+        return link_into(store(downloaded_path, key, fmt), job_base)
+
+def evict():
+    """Drop least recently used media until the cache is under its limit."""
+    with _lock:
+        return _cache.evict()
@@ -0,0 +1,488 @@
+"""
+📊 Metrics - Per-stage timing, throughput and API measurements
+
+Stages (download, transcribe, translate, tts, extract) are timed where
+the work happens, so pipelined runs are measured as well as sequential
+ones. Each stage records wall and CPU time, peak RSS and the amount of
+work done (audio seconds, characters, pages, bytes), from which the
+Whisper real-time factor and the throughput are derived. API calls
+record their latency, failures and retries per provider.
+
+CPU time and peak RSS are process-wide, not per stage. A stage's CPU
+time is the whole process's CPU while it ran, plus child processes
+(ffmpeg, worker pools) that exited meanwhile. When stages overlap (the
+pipeline) or jobs share the process (job runner, job service), a stage
+is charged the others' CPU too, so per-stage figures can add up to more
+than the run's total; compare them between runs, not within one. Peak
+RSS is the process's high-water mark, with the largest child reported
+separately.
+
+Measurements go to the job that is running in the current context
+(metrics.json in its process folder) and to process-wide totals that
+can be exported in the Prometheus text format. Selected stages can be
+profiled with cProfile or py-spy.
+
+Author: IA-ismo LAB
+"""
+
+import contextvars
+import cProfile
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FILENAME = "metrics.json"
+PROFILES_FOLDER = "profiles"
+
+# Settings read from config.ini, with the values used when a key is missing
+DEFAULT_SETTINGS = {
+    'enabled': True,
+    'profile_stages': (),
+    'profiler': 'cprofile',
+    'textfile': None,
+}
+
+_settings = dict(DEFAULT_SETTINGS)
+_current = contextvars.ContextVar('metrics_job', default=None)
+
+def settings_from_config(config, section='DEFAULT'):
+    """Read the metrics and profiling settings from a ConfigParser."""
+    stages = config.get(section, 'profile_stages', fallback='')
+    return {
+        'enabled': config.getboolean(section, 'metrics', fallback=True),
+        'profile_stages': tuple(s.strip() for s in stages.split(',') if s.strip()),
+        'profiler': config.get(section, 'profiler', fallback='cprofile').strip().lower(),
+        'textfile': config.get(section, 'metrics_textfile', fallback='') or None,
+    }
+
+def configure(**settings):
+    """Change the process-wide settings (see settings_from_config)."""
+    _settings.update(settings)
+
+def cpu_seconds():
+    """CPU time of this process plus its exited children (ffmpeg, worker pools).
+
+    Children are counted once they have been waited for, so a persistent
+    worker pool shows up when it is shut down. Every thread's CPU is
+    included, so a stage timed with this also pays for whatever else the
+    process was doing at the same time.
+    """
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+def _maxrss_mb(who):
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def peak_rss_mb():
+    """Peak resident memory of the process in MB, or None if unavailable.
+
+    This is the process-wide high-water mark since it started, so a stage
+    shows the largest footprint reached by the time it finished, not its own.
+    """
+    if resource is not None:
+        return _maxrss_mb(resource.RUSAGE_SELF)
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+def children_peak_rss_mb():
+    """Peak resident memory of the largest exited child in MB, or None."""
+    if resource is None:
+        return None
+    return _maxrss_mb(resource.RUSAGE_CHILDREN)
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+class Recorder:
+    """Stage and API totals of one job run, or of the whole process."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.started_cpu = cpu_seconds()
+        self.stages = {}
+        self.apis = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, name, wall, cpu, counts):
+        with self._lock:
+            entry = self.stages.setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            entry['calls'] += 1
+            entry['wall_seconds'] += wall
+            entry['cpu_seconds'] += cpu
+            for key, value in counts.items():
+                entry[key] = entry.get(key, 0) + value
+            for key, rss in (('peak_rss_mb', peak_rss_mb()), ('children_peak_rss_mb', children_peak_rss_mb())):
+                if rss is not None:
+                    entry[key] = max(entry.get(key, 0), rss)
+
+    def _api(self, provider):
+        return self.apis.setdefault(provider, {
+            'requests': 0, 'failures': 0, 'retries': 0, 'seconds': 0.0, 'latencies': deque(maxlen=1000),
+        })
+
+    def add_api_call(self, provider, seconds, failed=False):
+        with self._lock:
+            entry = self._api(provider)
+            entry['requests'] += 1
+            entry['failures'] += int(failed)
+            entry['seconds'] += seconds
+            entry['latencies'].append(seconds)
+
+    def add_api_retry(self, provider):
+        with self._lock:
+            self._api(provider)['retries'] += 1
+
+    def snapshot(self):
+        """Return the totals with the derived rates, ready for JSON."""
+        with self._lock:
+            stages = {name: dict(entry) for name, entry in self.stages.items()}
+            apis = {name: dict(entry, latencies=sorted(entry['latencies'])) for name, entry in self.apis.items()}
+        for entry in stages.values():
+            wall = entry['wall_seconds']
+            if entry.get('audio_seconds'):
+                entry['real_time_factor'] = round(wall / entry['audio_seconds'], 4)
+            for unit in ('chars_in', 'pages', 'bytes'):
+                if entry.get(unit) and wall > 0:
+                    entry[f"{unit}_per_second"] = round(entry[unit] / wall, 2)
+            entry['wall_seconds'] = round(wall, 3)
+            entry['cpu_seconds'] = round(entry['cpu_seconds'], 3)
+        for entry in apis.values():
+            latencies = entry.pop('latencies')
+            entry['seconds'] = round(entry['seconds'], 3)
+            entry['latency_avg'] = round(sum(latencies) / len(latencies), 3) if latencies else 0.0
+            entry['latency_p50'] = round(_percentile(latencies, 0.50), 3)
+            entry['latency_p95'] = round(_percentile(latencies, 0.95), 3)
+        return {
+            'wall_seconds': round(time.perf_counter() - self.started, 3),
+            'cpu_seconds': round(cpu_seconds() - self.started_cpu, 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'children_peak_rss_mb': children_peak_rss_mb(),
+            'stages': stages,
+            'apis': apis,
+        }
+
+_process = Recorder()
+_jobs_finished = {}
+_jobs_lock = threading.Lock()
+
+def _recorders():
+    """The process totals, the current job and the jobs it runs inside."""
+    recorders = [_process]
+    job = _current.get()
+    while job is not None:
+        recorders.append(job.recorder)
+        job = job.parent
+    return recorders
+
+def api_call(provider, seconds, failed=False):
+    """Record one API request (one attempt) and its latency."""
+    for recorder in _recorders():
+        recorder.add_api_call(provider, seconds, failed)
+
+def api_retry(provider):
+    """Record that an API request is being retried."""
+    for recorder in _recorders():
+        recorder.add_api_retry(provider)
+
+def bind(function):
+    """Wrap function so it records into the current job from another thread.
+
+    Context variables are not inherited by threads and pool workers; pass
+    thread targets and pool tasks through bind().
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # A fresh copy per call, so several threads can run it at once
+        return context.copy().run(function, *args, **kwargs)
+
+    return run
+
+class _Profile:
+    """cProfile or py-spy running for one stage."""
+
+    def __init__(self, name):
+        job = _current.get()
+        folder = os.path.join(job.folder if job is not None else "temp", PROFILES_FOLDER)
+        os.makedirs(folder, exist_ok=True)
+        self.base = os.path.join(folder, f"{name}_{datetime.now().strftime('%H%M%S_%f')}")
+        self.profiler = None
+        self.process = None
+        try:
+            if _settings['profiler'] == 'py-spy':
+                self._start_py_spy()
+            else:
+                self.profiler = cProfile.Profile()
+                self.profiler.enable()
+        except (OSError, ValueError) as e:
+            # Another profiler active, or py-spy missing or not allowed to attach
+            print(f"⚠️  Could not profile stage '{name}': {e}")
+            self.profiler = self.process = None
+
+    def _start_py_spy(self):
+        executable = shutil.which('py-spy')
+        if executable is None:
+            raise OSError("py-spy is not installed")
+        options = {}
+        if os.name == 'nt':
+            options['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        self.process = subprocess.Popen(
+            [executable, 'record', '--pid', str(os.getpid()), '--output', self.base + '.svg', '--nonblocking'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **options,
+        )
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.base + '.prof')
+            print(f"🔬 Profile saved to {self.base}.prof")
+        if self.process is not None:
+            # py-spy writes its flame graph when interrupted
+            self.process.send_signal(signal.CTRL_BREAK_EVENT if os.name == 'nt' else signal.SIGINT)
+            try:
+                self.process.wait(timeout=30)
+                print(f"🔬 Profile saved to {self.base}.svg")
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+class Stage:
+    """Time one stage of work and count what it processed.
+
+    Use it as a context manager, or start() and stop() it around each
+    step (for example each transcribed chunk) so time spent waiting on
+    the consumer is not counted, then call close() to record it.
+    """
+
+    def __init__(self, name, **counts):
+        self.name = name
+        self.counts = dict(counts)
+        self.wall = 0.0
+        self.cpu = 0.0
+        self._started = None
+        self._profile = None
+        self._closed = False
+
+    def add(self, **counts):
+        """Add to the work counters (audio_seconds, chars_in, pages, bytes...)."""
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def start(self):
+        """Start (or resume) timing."""
+        if self._profile is None and self.name in _settings['profile_stages']:
+            self._profile = _Profile(self.name)
+        self._started = (time.perf_counter(), cpu_seconds())
+
+    def stop(self):
+        """Pause timing; the time since start() is added to the stage."""
+        if self._started is None:
+            return
+        wall, cpu = self._started
+        self.wall += time.perf_counter() - wall
+        self.cpu += cpu_seconds() - cpu
+        self._started = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def close(self):
+        """Record the stage; later calls do nothing."""
+        if self._closed:
+            return
+        self._closed = True
+        self.stop()
+        if self._profile is not None:
+            self._profile.stop()
+        for recorder in _recorders():
+            recorder.add_stage(self.name, self.wall, self.cpu, self.counts)
+
+@contextmanager
+def stage(name, **counts):
+    """Time the body of a with block as one run of a stage."""
+    timer = Stage(name, **counts)
+    try:
+        with timer:
+            yield timer
+    finally:
+        timer.close()
+
+def timed(items, timer):
+    """Yield from items, timing only the work done to produce each one."""
+    iterator = iter(items)
+    try:
+        while True:
+            with timer:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        timer.close()
+
+class JobMetrics:
+    """The measurements of one run of a job, saved to its process folder."""
+
+    def __init__(self, folder, info):
+        self.folder = folder
+        self.info = info
+        self.recorder = Recorder()
+        self.started = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # A job started inside another one (a video of a batch) counts for both
+        self.parent = _current.get()
+        self._token = _current.set(self)
+
+    def finish(self, status='done'):
+        """Stop recording and append this run to metrics.json."""
+        if self._token is None:
+            return None
+        _current.reset(self._token)
+        self._token = None
+        with _jobs_lock:
+            _jobs_finished[status] = _jobs_finished.get(status, 0) + 1
+        if _settings['textfile']:
+            write_prometheus(_settings['textfile'])
+        if not _settings['enabled'] or not self.folder:
+            return None
+
+        run = dict(self.recorder.snapshot(), started=self.started, status=status, **self.info)
+        run['finished'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        path = os.path.join(self.folder, FILENAME)
+        data = {'runs': []}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except ValueError:
+                pass
+        data.setdefault('runs', []).append(run)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, path)
+        print(f"📊 {summary(run)}")
+        print(f"📊 Metrics saved to {path}")
+        return run
+
+def start_job(folder, **info):
+    """Start recording a job run in the current context; call finish() at the end."""
+    return JobMetrics(folder, info)
+
+@contextmanager
+def job(folder, **info):
+    """Record the body of a with block as one run of the job in folder."""
+    run = start_job(folder, **info)
+    status = 'failed'
+    try:
+        yield run
+        status = 'done'
+    finally:
+        run.finish(status)
+
+def summary(run):
+    """One line per stage describing a saved run, for console output."""
+    parts = []
+    for name, entry in run['stages'].items():
+        text = f"{name} {entry['wall_seconds']:.1f}s (CPU {entry['cpu_seconds']:.1f}s"
+        if 'real_time_factor' in entry:
+            text += f", RTF {entry['real_time_factor']:.2f}"
+        if 'chars_in_per_second' in entry:
+            text += f", {entry['chars_in_per_second']:.0f} chars/s"
+        if 'pages_per_second' in entry:
+            text += f", {entry['pages_per_second']:.1f} pages/s"
+        parts.append(text + ")")
+    return f"Run {run['wall_seconds']:.1f}s: " + ", ".join(parts) if parts else f"Run {run['wall_seconds']:.1f}s"
+
+def process_totals():
+    """Totals of every stage and API call in this process so far."""
+    return _process.snapshot()
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+def prometheus_text():
+    """Process-wide totals in the Prometheus text exposition format."""
+    totals = process_totals()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP castellanator_{name} {help_text}")
+        lines.append(f"# TYPE castellanator_{name} {kind}")
+        for labels, value in samples:
+            lines.append(f"castellanator_{name}{labels} {value}")
+
+    stages = totals['stages']
+    metric('stage_calls_total', 'counter', "Times each stage ran.",
+           [(_labels(stage=s), e['calls']) for s, e in stages.items()])
+    metric('stage_wall_seconds_total', 'counter', "Wall-clock seconds spent in each stage.",
+           [(_labels(stage=s), e['wall_seconds']) for s, e in stages.items()])
+    metric('stage_cpu_seconds_total', 'counter', "Process-wide CPU seconds (plus exited children) while each stage ran; overlapping stages and jobs share them.",
+           [(_labels(stage=s), e['cpu_seconds']) for s, e in stages.items()])
+    units = ('audio_seconds', 'chars_in', 'chars_out', 'pages', 'bytes', 'cached')
+    metric('stage_work_total', 'counter', "Work done by each stage, by unit.",
+           [(_labels(stage=s, unit=u), e[u]) for s, e in stages.items() for u in units if u in e])
+    metric('stage_real_time_factor', 'gauge', "Transcription seconds per second of audio.",
+           [(_labels(stage=s), e['real_time_factor']) for s, e in stages.items() if 'real_time_factor' in e])
+
+    apis = totals['apis']
+    metric('api_requests_total', 'counter', "API requests sent, by provider.",
+           [(_labels(provider=p), e['requests']) for p, e in apis.items()])
+    metric('api_failures_total', 'counter', "API requests that failed, by provider.",
+           [(_labels(provider=p), e['failures']) for p, e in apis.items()])
+    metric('api_retries_total', 'counter', "API requests retried, by provider.",
+           [(_labels(provider=p), e['retries']) for p, e in apis.items()])
+    metric('api_latency_seconds', 'summary', "API request latency, by provider.",
+           [sample for p, e in apis.items() for sample in (
+               (_labels(provider=p, quantile="0.5"), e['latency_p50']),
+               (_labels(provider=p, quantile="0.95"), e['latency_p95']),
+           )])
+    lines.extend(f"castellanator_api_latency_seconds_{field}{_labels(provider=p)} {e[key]}"
+                 for p, e in apis.items() for field, key in (('sum', 'seconds'), ('count', 'requests')))
+
+    with _jobs_lock:
+        jobs = dict(_jobs_finished)
+    metric('jobs_total', 'counter', "Job runs finished, by status.",
+           [(_labels(status=s), n) for s, n in jobs.items()])
+    if totals['peak_rss_mb'] is not None:
+        metric('peak_rss_bytes', 'gauge', "Peak resident memory of the process.",
+               [("", int(totals['peak_rss_mb'] * 1024 * 1024))])
+    if totals['children_peak_rss_mb'] is not None:
+        metric('children_peak_rss_bytes', 'gauge', "Peak resident memory of the largest exited child process.",
+               [("", int(totals['children_peak_rss_mb'] * 1024 * 1024))])
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path):
+    """Write the Prometheus text export atomically (for a textfile collector)."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text())
+    os.replace(temp_path, path)
@@ -0,0 +1,160 @@
+"""
+🧠 Whisper Model Registry - Keep models resident across jobs
+
+Loads each (model name, device) pair once per process and shares it between
+YouTube, PDF and local-audio jobs. Models that have not been used for a while
+are released by a background reaper so long-running sessions do not hold
+several GB of weights they no longer need.
+
+Author: IA-ismo LAB
+"""
+
+import gc
+import threading
+import time
+from contextlib import contextmanager
+
+import whisper
+
+# Seconds a model may stay unused before it is released
+DEFAULT_IDLE_SECONDS = 15 * 60
+
+_models = {}
+_lock = threading.Lock()
+_reaper = None
+_idle_seconds = DEFAULT_IDLE_SECONDS
+
+def resolve_device(device=None):
+    """Resolve the device Whisper would pick so cache keys are stable."""
+    if device:
+        return device
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def set_idle_timeout(seconds):
+    """Change how long an unused model is kept in memory."""
+    global _idle_seconds
+    _idle_seconds = max(0, int(seconds))
+
+def _get_entry(name, device):
+    """Return the registry entry for a model, loading it on first use."""
+    key = (name, device)
+    with _lock:
+        entry = _models.get(key)
+        if entry is None:
+            entry = {
+                "model": None,
+                "last_used": time.monotonic(),
+                "users": 0,
+                "load_lock": threading.Lock(),
+                "use_lock": threading.Lock(),
+            }
+            _models[key] = entry
+        entry["users"] += 1
+        entry["last_used"] = time.monotonic()
+
+    # Load outside the registry lock so other models stay available
+    with entry["load_lock"]:
+        if entry["model"] is None:
+            try:
+                print(f"🔄 Loading Whisper model: {name} ({device})")
+                start = time.monotonic()
+                entry["model"] = whisper.load_model(name, device=device)
+                print(f"✅ Whisper model loaded in {time.monotonic() - start:.1f}s")
+            except Exception:
+                with _lock:
+                    entry["users"] -= 1
+                    if entry["model"] is None and entry["users"] == 0:
+                        _models.pop(key, None)
+                raise
+    _start_reaper()
+    return entry
+
+def _release_entry(entry):
+    """Mark a registry entry as no longer in use."""
+    with _lock:
+        entry["users"] -= 1
+        entry["last_used"] = time.monotonic()
+
+def preload_model(name="small", device=None):
+    """Load a model into the registry ahead of its first use.
+
+    Nothing is borrowed: the model counts as just used and is released
+    once idle like any other.
+    """
+    _release_entry(_get_entry(name, resolve_device(device)))
+
+def get_model(name="small", device=None):
+    """Return a resident Whisper model, loading it only the first time.
+
+    The caller holds a reference, so the reaper keeps the model until
+    release_model(name, device) is called. Prefer use_model(), which also
+    gives exclusive access and releases on its own.
+    """
+    return _get_entry(name, resolve_device(device))["model"]
+
+def release_model(name="small", device=None):
+    """Give back a model taken with get_model()."""
+    with _lock:
+        entry = _models.get((name, resolve_device(device)))
+    if entry is not None:
+        _release_entry(entry)
+
+@contextmanager
+def use_model(name="small", device=None):
+    """Borrow a resident model with exclusive access for one transcription.
+
+    Whisper installs decoding hooks on the model while it runs, so two
+    threads must not transcribe with the same instance at the same time.
+    Models borrowed here are never released by the reaper mid-job.
+    """
+    device = resolve_device(device)
+    entry = _get_entry(name, device)
+    try:
+        with entry["use_lock"]:
+            yield entry["model"]
+    finally:
+        _release_entry(entry)
+
+def release_idle_models(max_idle_seconds=None):
+    """Free models that have not been used for max_idle_seconds."""
+    if max_idle_seconds is None:
+        max_idle_seconds = _idle_seconds
+    now = time.monotonic()
+    released = []
+    with _lock:
+        for key, entry in list(_models.items()):
+            if entry["users"] == 0 and now - entry["last_used"] >= max_idle_seconds:
+                del _models[key]
+                released.append(key)
+
+    if released:
+        gc.collect()
+        if any(device.startswith("cuda") for _, device in released):
+            import torch
+            torch.cuda.empty_cache()
+        for name, device in released:
+            print(f"🧹 Released idle Whisper model: {name} ({device})")
+    return released
+
+def loaded_models():
+    """List the (model name, device) pairs currently resident."""
+    with _lock:
+        return [key for key, entry in _models.items() if entry["model"] is not None]
+
+def _reaper_loop():
+    """Periodically release models that have been idle too long."""
+    while True:
+        time.sleep(max(1, min(60, _idle_seconds)))
+        try:
+            release_idle_models()
+        except Exception as e:
+            print(f"⚠️  Model reaper error: {e}")
+
+def _start_reaper():
+    """Start the background reaper thread once per process."""
+    global _reaper
+    with _lock:
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reaper_loop, name="whisper-model-reaper", daemon=True)
+            _reaper.start()
@@ -0,0 +1,136 @@
+"""
+📑 PDF Cache - Reuse text already extracted from PDF pages
+
+Each page is identified by a hash of its content stream (plus the fonts,
+Form XObjects and geometry that shape its text), and its extracted text is stored
+under that hash and the extractor version. A per-file index maps the
+file's SHA-256 to its page hashes, so an unchanged file is recognised
+without parsing it, and an edited file only re-extracts the pages whose
+content changed.
+
+Author: IA-ismo LAB
+"""
+
+import hashlib
+import json
+import os
+
+from disk_cache import CACHE_ROOT, DiskCache, file_digest, make_key
+
+# Bump when the extraction code changes so stale text is not reused
+EXTRACTOR_VERSION = 2
+DEFAULT_MAX_MB = 512
+
+_cache = DiskCache(os.path.join(CACHE_ROOT, "pdf_pages"), DEFAULT_MAX_MB * 1024 * 1024, suffix=".json")
+
+def configure(max_mb=DEFAULT_MAX_MB, directory=None):
+    """Set the size limit (and optionally the folder) of the cache."""
+    _cache.max_bytes = int(float(max_mb) * 1024 * 1024)
+    if directory:
+        _cache.directory = directory
+
+def _hash_object(digest, obj, memo):
+    """Feed a PDF object into digest, following references into their streams.
+
+    Referenced objects are hashed once per file and fed in by digest, so
+    fonts and Form XObjects shared by many pages are only read once.
+    Image data is skipped: it can't change the extracted text.
+    """
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+    if isinstance(obj, IndirectObject):
+        ref = (obj.idnum, obj.generation)
+        if ref not in memo:
+            memo[ref] = None  # Breaks reference cycles
+            sub = hashlib.sha256()
+            _hash_object(sub, obj.get_object(), memo)
+            memo[ref] = sub.hexdigest()
+        digest.update(f"ref:{memo[ref]};".encode('utf-8'))
+    elif isinstance(obj, DictionaryObject):
+        if obj.get('/Subtype') == '/Image':
+            digest.update(b"image;")
+            return
+        for key in sorted(obj.keys()):
+            if key != '/Parent':
+                digest.update(f"{key}=".encode('utf-8'))
+                _hash_object(digest, obj[key], memo)
+        if isinstance(obj, StreamObject):
+            digest.update(obj.get_data())
+        digest.update(b";")
+    elif isinstance(obj, ArrayObject):
+        digest.update(b"[")
+        for item in obj:
+            _hash_object(digest, item, memo)
+        digest.update(b"]")
+    else:
+        digest.update(f"{obj!r};".encode('utf-8'))
+
+def _page_hash(page, memo):
+    """Hash what determines a PyPDF2 page's text, or None if unreadable.
+
+    That is the content stream plus everything its resources resolve to:
+    font dictionaries with their ToUnicode maps, and Form XObjects with
+    their own content and resources.
+    """
+    try:
+        digest = hashlib.sha256()
+        contents = page.get_contents()
+        if contents is not None:
+            digest.update(contents.get_data())
+        resources = page.get('/Resources')
+        if resources is not None:
+            _hash_object(digest, resources, memo)
+        digest.update(repr([float(v) for v in page.mediabox]).encode('utf-8'))
+        digest.update(repr(page.get('/Rotate', 0)).encode('utf-8'))
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+def _read_json(key):
+    data = _cache.get(key)
+    if data is None:
+        return None
+    try:
+        return json.loads(data.decode('utf-8'))
+    except ValueError:
+        return None
+
+def _write_json(key, value):
+    _cache.put(key, json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+def page_hashes(pdf_path):
+    """Return one content hash per page (None where a page can't be hashed).
+
+    The list is stored in the per-file index, so only the first run on a
+    file has to read its page streams. Finding the index still reads the
+    whole file to digest it, so callers working through a file in parts
+    should compute this once and pass it along.
+    """
+    index_key = make_key("pdf_index", file_digest(pdf_path), EXTRACTOR_VERSION)
+    hashes = _read_json(index_key)
+    if hashes is not None:
+        return hashes
+    import PyPDF2
+    with open(pdf_path, 'rb') as f:
+        memo = {}
+        hashes = [_page_hash(page, memo) for page in PyPDF2.PdfReader(f).pages]
+    _write_json(index_key, hashes)
+    return hashes
+
+def _page_key(page_hash):
+    return make_key("pdf_page", page_hash, EXTRACTOR_VERSION)
+
+def lookup_pages(hashes):
+    """Return {position: text} for every hash with cached text."""
+    found = {}
+    for position, page_hash in enumerate(hashes):
+        if page_hash is None:
+            continue
+        entry = _read_json(_page_key(page_hash))
+        if entry is not None:
+            found[position] = entry.get('text', "")
+    return found
+
+def store_page(page_hash, text):
+    """Save the extracted text of one page."""
+    if page_hash is not None:
+        _write_json(_page_key(page_hash), {'text': text})
@@ -0,0 +1,190 @@
+"""
+📚 PDF Extractor - Parallel page-range text extraction
+
+Page ranges are spread over a process pool; each worker opens the PDF
+once and extracts its pages with pdfplumber, falling back to PyPDF2 for
+a single page when pdfplumber fails on it. Every page's layout objects
+are released as soon as its text is out, and the pages are joined once,
+in order, at the end. Pages already in the PDF cache are not extracted
+again, and when every page hits pdfplumber is never opened.
+
+Author: IA-ismo LAB
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+import pdf_cache
+
+MIN_PAGES_PER_RANGE = 4
+RANGES_PER_WORKER = 4
+
+def default_workers():
+    """Use every core but one for extraction."""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+def page_count(pdf_path):
+    """Return the number of pages in a PDF."""
+    import PyPDF2
+    try:
+        with open(pdf_path, 'rb') as f:
+            return len(PyPDF2.PdfReader(f).pages)
+    except Exception:
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+
+def page_ranges(first, last, workers):
+    """Split pages [first, last) into ranges that keep the workers busy.
+
+    Several ranges per worker even out documents where some pages are far
+    more expensive than others (scans, dense tables).
+    """
+    total = last - first
+    if total <= 0:
+        return []
+    size = max(MIN_PAGES_PER_RANGE, -(-total // (workers * RANGES_PER_WORKER)))
+    return [(start, min(start + size, last)) for start in range(first, last, size)]
+
+def _runs(indices):
+    """Group sorted page indices into contiguous [start, end) runs."""
+    runs = []
+    for index in indices:
+        if runs and runs[-1][1] == index:
+            runs[-1][1] = index + 1
+        else:
+            runs.append([index, index + 1])
+    return [tuple(run) for run in runs]
+
+class _PyPDF2Pages:
+    """Open the PyPDF2 reader only when a page actually needs the fallback."""
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+        self._file = None
+        self._reader = None
+
+    def extract(self, index):
+        if self._reader is None:
+            import PyPDF2
+            self._file = open(self.pdf_path, 'rb')
+            self._reader = PyPDF2.PdfReader(self._file)
+        return self._reader.pages[index].extract_text() or ""
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+def _extract_range(job):
+    """Extract pages [start, end) and return (texts, fallback_pages)."""
+    pdf_path, start, end = job
+    import pdfplumber
+    fallback = _PyPDF2Pages(pdf_path)
+    texts = []
+    fallback_pages = []
+    try:
+        try:
+            pdf = pdfplumber.open(pdf_path, pages=list(range(start + 1, end + 1)))
+        except Exception:
+            pdf = None
+        if pdf is None:
+            for index in range(start, end):
+                texts.append(_fallback_text(fallback, index))
+                fallback_pages.append(index)
+            return texts, fallback_pages
+        with pdf:
+            for offset, page in enumerate(pdf.pages):
+                try:
+                    texts.append(page.extract_text() or "")
+                except Exception:
+                    texts.append(_fallback_text(fallback, start + offset))
+                    fallback_pages.append(start + offset)
+                finally:
+                    # Drop the page's cached layout objects right away
+                    if hasattr(page, 'close'):
+                        page.close()
+        return texts, fallback_pages
+    finally:
+        fallback.close()
+
+def _fallback_text(fallback, index):
+    """Extract one page with PyPDF2, or an empty string if that fails too."""
+    try:
+        return fallback.extract(index)
+    except Exception as e:
+        print(f"⚠️  Could not extract page {index + 1}: {e}")
+        return ""
+
+def cached_page_hashes(pdf_path):
+    """Return pdf_cache.page_hashes for a file, or None if it can't be hashed."""
+    try:
+        return pdf_cache.page_hashes(pdf_path)
+    except Exception as e:
+        print(f"⚠️  PDF cache unavailable for this file: {e}")
+        return None
+
+def extract_pages(pdf_path, workers=None, first=0, last=None, cache=True, hashes=None):
+    """Return the text of pages [first, last) as a list, in page order.
+
+    hashes is the file's cached_page_hashes, for callers that extract a
+    file in several calls and shouldn't digest it again each time.
+    """
+    with metrics.stage('extract') as timer:
+        texts = _extract_pages(pdf_path, workers, first, last, cache, hashes)
+        timer.add(pages=len(texts), chars_out=sum(len(text) for text in texts if text))
+    return texts
+
+def _extract_pages(pdf_path, workers, first, last, cache, hashes):
+    """extract_pages without the stage measurement."""
+    if not cache:
+        hashes = None
+    elif hashes is None:
+        hashes = cached_page_hashes(pdf_path)
+    total = len(hashes) if hashes is not None else page_count(pdf_path)
+    last = total if last is None else min(last, total)
+    texts = [None] * max(0, last - first)
+    if hashes is not None:
+        for position, text in pdf_cache.lookup_pages(hashes[first:last]).items():
+            texts[position] = text
+    missing = [first + i for i, text in enumerate(texts) if text is None]
+    if len(missing) < len(texts):
+        print(f"♻️  {len(texts) - len(missing)}/{len(texts)} pages reused from the PDF cache")
+    if not missing:
+        return texts
+
+    workers = max(1, int(workers or default_workers()))
+    ranges = [r for start, end in _runs(missing) for r in page_ranges(start, end, workers)]
+    jobs = [(pdf_path, start, end) for start, end in ranges]
+    workers = min(workers, len(jobs))
+    print(f"📄 Processing {len(missing)} pages with {workers} workers...")
+
+    fallback_pages = []
+    done = 0
+    if workers <= 1:
+        results = map(_extract_range, jobs)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_extract_range, jobs)
+    try:
+        for (start, end), (range_texts, range_fallback) in zip(ranges, results):
+            for index, text in zip(range(start, end), range_texts):
+                texts[index - first] = text
+                if hashes is not None:
+                    pdf_cache.store_page(hashes[index], text)
+            fallback_pages.extend(range_fallback)
+            done += end - start
+            print(f"📄 Processed page {done}/{len(missing)}", end='\r')
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    print()
+    if fallback_pages:
+        print(f"🔄 {len(fallback_pages)} pages extracted with PyPDF2")
+    return texts
+
+def extract_text(pdf_path, workers=None, cache=True):
+    """Extract the whole text of a PDF, one line break between pages."""
+    pages = extract_pages(pdf_path, workers, cache=cache)
+    return "\n".join(text for text in pages if text).strip()
@@ -0,0 +1,144 @@
+"""
+🔀 Pipeline - Overlap transcription, translation and TTS across chunks
+
+Each stage runs in its own thread and hands chunks to the next stage
+through a bounded queue. Chunk N is translated and synthesized while chunk
+N+1 is still being transcribed, so the end-to-end time approaches that of
+the slowest stage instead of the sum of all stages. Chunks keep their
+order from source to sink.
+
+Author: IA-ismo LAB
+"""
+
+import queue
+import threading
+
+import metrics
+
+_DONE = object()
+
+class PipelineError(Exception):
+    """Raised when a pipeline stage fails; wraps the original error."""
+
+    def __init__(self, stage, error):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+def _put(q, item, stop):
+    """Put an item on a queue unless the pipeline is being stopped."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.2)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q, stop):
+    """Get the next item from a queue, or _DONE if the pipeline stopped."""
+    while True:
+        try:
+            return q.get(timeout=0.2)
+        except queue.Empty:
+            if stop.is_set():
+                return _DONE
+
+def run_pipeline(source, stages, queue_size=2, finish_source=False):
+    """Feed items from source through stages and return the final outputs.
+
+    source is an iterable (typically a generator doing the first stage's
+    work, such as transcription). stages is a list of (name, function)
+    pairs; each function takes the output of the previous stage. Queues
+    hold at most queue_size chunks so a fast stage cannot run far ahead.
+
+    With finish_source=True a failing stage does not cut the source short:
+    it is run to its end (its items discarded) before the error is raised,
+    so work it saves as a side effect, like a transcript, is complete and
+    can be reused. Ctrl+C still stops it right away.
+    """
+    stop = threading.Event()
+    interrupted = threading.Event()
+    errors = []
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    results = []
+
+    def fail(name, error):
+        errors.append(PipelineError(name, error))
+        stop.set()
+
+    def feed():
+        try:
+            for item in source:
+                if not _put(queues[0], item, stop):
+                    break
+            else:
+                return
+            if finish_source and errors and not interrupted.is_set():
+                print(f"⏳ {errors[0]}; finishing the source so its work is kept...")
+                for _ in source:
+                    if interrupted.is_set():
+                        break
+        except Exception as e:
+            fail('source', e)
+        finally:
+            # Release what the source generator holds (decoded audio, model lock)
+            if hasattr(source, 'close'):
+                source.close()
+            _put(queues[0], _DONE, stop)
+
+    def work(index, name, function):
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+        while True:
+            item = _get(inbox, stop)
+            if item is _DONE:
+                break
+            try:
+                output = function(item)
+            except Exception as e:
+                fail(name, e)
+                break
+            if outbox is None:
+                results.append(output)
+            elif not _put(outbox, output, stop):
+                break
+        if outbox is not None:
+            _put(outbox, _DONE, stop)
+
+    # Stage threads record their measurements into the caller's job
+    threads = [threading.Thread(target=metrics.bind(feed), name="pipeline-source", daemon=True)]
+    for index, (name, function) in enumerate(stages):
+        threads.append(threading.Thread(target=metrics.bind(work), args=(index, name, function),
+                                        name=f"pipeline-{name}", daemon=True))
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        interrupted.set()
+        stop.set()
+        raise
+
+    if errors:
+        raise errors[0]
+    return results
+
+def group_segments(segments, max_chars):
+    """Group streamed transcript segments into text blocks of about max_chars."""
+    block = []
+    length = 0
+    for segment in segments:
+        text = segment['text'].strip()
+        if not text:
+            continue
+        block.append(text)
+        length += len(text) + 1
+        # Close blocks on sentence ends so translation gets whole sentences
+        if length >= max_chars and (text[-1] in '.!?…' or length >= 2 * max_chars):
+            yield " ".join(block)
+            block = []
+            length = 0
+    if block:
+        yield " ".join(block)
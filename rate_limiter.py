@@ -0,0 +1,196 @@
+"""
+🚦 Rate Limiter - Quota-aware scheduling for LLM API requests
+
+A RequestScheduler sits in front of a backend and paces calls with token
+buckets for requests per minute and tokens per minute. It retries
+transient errors (429, 5xx, timeouts) with exponential backoff and jitter,
+enforces a per-request deadline and keeps queue-depth and latency
+metrics. One scheduler per provider is shared by every job in the process
+so concurrent jobs stay under the same quota together.
+
+Author: IA-ismo LAB
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+import metrics
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+RETRYABLE_NAMES = {
+    'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable',
+    'InternalServerError', 'DeadlineExceeded', 'GatewayTimeout',
+    'Aborted', 'Unknown', 'RetryError',
+}
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+def is_retryable(error):
+    """Tell whether an API error is worth retrying."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, 'code', None)
+    if callable(code):
+        try:
+            code = code()
+        except Exception:
+            code = None
+    if isinstance(code, int) and code in RETRYABLE_STATUS:
+        return True
+    status = getattr(error, 'status_code', None)
+    if isinstance(status, int) and status in RETRYABLE_STATUS:
+        return True
+    return type(error).__name__ in RETRYABLE_NAMES
+
+class TokenBucket:
+    """Continuously refilled token bucket with a per-minute rate."""
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1, deadline=None):
+        """Block until amount tokens are available; return seconds waited.
+
+        Requests larger than the bucket are clamped to its capacity so a
+        single huge prompt cannot wait forever.
+        """
+        amount = min(float(amount), self.capacity)
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return now - started
+                wait = (amount - self.tokens) / self.rate if self.rate > 0 else 1.0
+            if deadline is not None and now + wait > deadline:
+                raise TimeoutError("Rate limit wait would exceed the request deadline")
+            time.sleep(min(wait, 1.0))
+
+class RequestScheduler:
+    """Pace, retry and measure calls to a rate-limited API."""
+
+    def __init__(self, requests_per_minute=15, tokens_per_minute=1000000, max_retries=5,
+                 base_delay=1.0, max_delay=60.0, request_timeout=120.0, deadline_seconds=600.0, name='api'):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.request_timeout = request_timeout
+        self.deadline_seconds = deadline_seconds
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._counters = {'queued': 0, 'in_flight': 0, 'requests': 0, 'retries': 0,
+                          'failures': 0, 'wait_seconds': 0.0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def backoff(self, attempt):
+        """Delay before retry number attempt: exponential with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn, tokens=1, deadline_seconds=None):
+        """Run fn(timeout) under the rate limits, retrying transient errors.
+
+        fn receives the seconds left for this attempt and should pass them to
+        the client as its request timeout. The whole call, including waits
+        and retries, must finish within deadline_seconds (the scheduler's
+        default deadline when not given).
+        """
+        deadline = None
+        deadline_seconds = deadline_seconds or self.deadline_seconds
+        if deadline_seconds:
+            deadline = time.monotonic() + deadline_seconds
+
+        attempt = 0
+        while True:
+            self._count('queued')
+            try:
+                waited = self.requests.acquire(1, deadline)
+                waited += self.tokens.acquire(tokens, deadline)
+            finally:
+                self._count('queued', -1)
+            self._count('wait_seconds', waited)
+
+            timeout = self.request_timeout
+            if deadline is not None:
+                timeout = min(timeout, max(0.1, deadline - time.monotonic()))
+
+            self._count('in_flight')
+            started = time.monotonic()
+            try:
+                result = fn(timeout)
+            except Exception as e:
+                self._count('in_flight', -1)
+                # Each attempt is measured on its own, without pacing waits or backoff
+                metrics.api_call(self.name, time.monotonic() - started, failed=True)
+                retry_delay = self.backoff(attempt)
+                out_of_time = deadline is not None and time.monotonic() + retry_delay > deadline
+                if attempt >= self.max_retries or not is_retryable(e) or out_of_time:
+                    self._count('failures')
+                    raise
+                attempt += 1
+                self._count('retries')
+                metrics.api_retry(self.name)
+                print(f"⚠️  API error ({type(e).__name__}), retry {attempt}/{self.max_retries} "
+                      f"in {retry_delay:.1f}s")
+                time.sleep(retry_delay)
+                continue
+
+            latency = time.monotonic() - started
+            metrics.api_call(self.name, latency)
+            with self._lock:
+                self._counters['in_flight'] -= 1
+                self._counters['requests'] += 1
+                self._latencies.append(latency)
+            return result
+
+    def metrics(self):
+        """Return queue depth, counters and latency percentiles."""
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = sorted(self._latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        counters['queue_depth'] = counters.pop('queued')
+        counters['latency_avg'] = sum(latencies) / len(latencies) if latencies else 0.0
+        counters['latency_p50'] = percentile(0.50)
+        counters['latency_p95'] = percentile(0.95)
+        return counters
+
+    def summary(self):
+        """One-line description of the metrics for console output."""
+        m = self.metrics()
+        return (f"{m['requests']} requests, {m['retries']} retries, {m['failures']} failures, "
+                f"latency avg {m['latency_avg']:.2f}s / p95 {m['latency_p95']:.2f}s, "
+                f"rate-limit wait {m['wait_seconds']:.1f}s")
+
+def get_scheduler(name, **limits):
+    """Return the process-wide scheduler for a provider, creating it once."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(name)
+        if scheduler is None:
+            scheduler = RequestScheduler(name=name, **limits)
+            _schedulers[name] = scheduler
+        return scheduler
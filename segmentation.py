@@ -0,0 +1,177 @@
+"""
+🔇 Segmentation - Energy-based speech detection before Whisper
+
+Finds speech regions in a decoded 16 kHz buffer, drops long stretches of
+silence and places chunk boundaries on pauses instead of fixed offsets.
+Every chunk keeps its start offset so Whisper timestamps can be mapped
+back onto the original timeline.
+
+Author: IA-ismo LAB
+"""
+
+import numpy as np
+
+from audio_decode import SAMPLE_RATE
+
+FRAME_SECONDS = 0.03
+
+# Frames processed per block so huge memory-mapped inputs stay cheap
+_FRAMES_PER_BLOCK = 20000
+
+def frame_energy_db(audio, frame_seconds=FRAME_SECONDS):
+    """Return the RMS level of each frame in dBFS."""
+    frame = max(1, int(frame_seconds * SAMPLE_RATE))
+    n_frames = len(audio) // frame
+    levels = np.empty(n_frames, dtype=np.float32)
+    for first in range(0, n_frames, _FRAMES_PER_BLOCK):
+        last = min(first + _FRAMES_PER_BLOCK, n_frames)
+        block = np.asarray(audio[first * frame:last * frame], dtype=np.float32)
+        block = block.reshape(last - first, frame)
+        rms = np.sqrt(np.mean(np.square(block), axis=1))
+        levels[first:last] = 20 * np.log10(rms + 1e-10)
+    return levels
+
+def _runs(mask):
+    """Return (start, end) frame indices of consecutive True runs."""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+def speech_regions(audio, threshold_db=-45.0, min_pause_seconds=0.3,
+                   min_speech_seconds=0.2, pad_seconds=0.2):
+    """Detect speech as (start_sample, end_sample) regions.
+
+    Frames louder than threshold_db (or clearly above the noise floor on
+    noisy recordings) count as speech. Pauses shorter than
+    min_pause_seconds are bridged and every region is padded slightly so
+    word onsets and tails are not clipped.
+    """
+    levels = frame_energy_db(audio)
+    if len(levels) == 0:
+        return []
+
+    # Raise the threshold on noisy recordings so hiss is not taken for speech
+    noise_floor = float(np.percentile(levels, 10))
+    threshold = max(threshold_db, noise_floor + 6.0)
+    regions = _runs(levels > threshold)
+
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    min_pause = int(min_pause_seconds / FRAME_SECONDS)
+    min_speech = int(min_speech_seconds / FRAME_SECONDS)
+    pad = int(pad_seconds * SAMPLE_RATE)
+
+    merged = []
+    for start, end in regions:
+        if merged and start - merged[-1][1] < min_pause:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    spans = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        spans.append((max(0, start * frame - pad), min(len(audio), end * frame + pad)))
+
+    # Padding can make neighbours touch; fold them back together
+    folded = []
+    for start, end in spans:
+        if folded and start <= folded[-1][1]:
+            folded[-1] = (folded[-1][0], max(end, folded[-1][1]))
+        else:
+            folded.append((start, end))
+    return folded
+
+def _split_long_region(audio, start, end, max_samples):
+    """Split a region longer than max_samples at its quietest points."""
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    pieces = []
+    while end - start > max_samples:
+        # Look for the quietest frame in the last fifth of the allowed span
+        search_from = start + int(max_samples * 0.8)
+        search_to = start + max_samples
+        levels = frame_energy_db(audio[search_from:search_to])
+        if len(levels):
+            cut = search_from + int(np.argmin(levels)) * frame
+        else:
+            cut = search_to
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+def plan_chunks(audio, max_chunk_seconds, skip_silence_seconds=2.0, threshold_db=-45.0):
+    """Plan speech-only chunks no longer than max_chunk_seconds.
+
+    Regions separated by less than skip_silence_seconds share a chunk
+    (short pauses stay in so Whisper keeps its context). Longer silences
+    are dropped and become natural chunk boundaries. When a chunk would
+    grow past the limit it is closed at the preceding pause.
+    """
+    max_samples = max(1, int(max_chunk_seconds * SAMPLE_RATE))
+    skip_samples = int(skip_silence_seconds * SAMPLE_RATE)
+
+    chunks = []
+    for start, end in speech_regions(audio, threshold_db=threshold_db):
+        if chunks:
+            chunk_start, chunk_end = chunks[-1]
+            if start - chunk_end < skip_samples and end - chunk_start <= max_samples:
+                chunks[-1] = (chunk_start, end)
+                continue
+        if end - start > max_samples:
+            chunks.extend(_split_long_region(audio, start, end, max_samples))
+        else:
+            chunks.append((start, end))
+    return chunks
+
+def rolling_windows(blocks, window_seconds):
+    """Group streamed sample blocks into windows of about window_seconds.
+
+    Each window is closed at the quietest frame of its last fifth and the
+    rest carries over into the next one, so words are rarely cut. Yields
+    (start_sample, samples); only the audio not yet yielded is buffered.
+    """
+    window = max(1, int(window_seconds * SAMPLE_RATE))
+    pending = []
+    pending_samples = 0
+    start = 0
+    for block in blocks:
+        pending.append(block)
+        pending_samples += len(block)
+        while pending_samples > window:
+            buffer = np.concatenate(pending)
+            cut = _split_long_region(buffer, 0, len(buffer), window)[0][1]
+            yield start, buffer[:cut]
+            start += cut
+            pending = [buffer[cut:]]
+            pending_samples = len(buffer) - cut
+    if pending_samples:
+        yield start, np.concatenate(pending)
+
+def speech_seconds(spans):
+    """Total duration covered by a list of sample spans."""
+    return sum(end - start for start, end in spans) / SAMPLE_RATE
+
+def offset_result(result, offset_seconds):
+    """Shift the timestamps of a Whisper result onto the source timeline."""
+    for segment in result.get('segments', []):
+        segment['start'] += offset_seconds
+        segment['end'] += offset_seconds
+        for word in segment.get('words', []) or []:
+            word['start'] += offset_seconds
+            word['end'] += offset_seconds
+    return result
+
+def merge_results(results, spans):
+    """Join chunk results in order using the chunk offset map."""
+    segments = []
+    texts = []
+    for result, (start, _) in zip(results, spans):
+        offset_result(result, start / SAMPLE_RATE)
+        segments.extend(result.get('segments', []))
+        texts.append(result['text'].strip())
+    return {
+        'text': " ".join(text for text in texts if text),
+        'segments': segments,
+        'language': results[0].get('language') if results else None,
+    }
@@ -0,0 +1,204 @@
+"""
+📡 Stream Transcriber - Streaming segment-level Whisper transcription
+
+`transcribe_segments` yields segments (text, start, end) as soon as each
+chunk of audio has been transcribed, so callers can show progress, write
+the transcript incrementally and start later stages early. It combines the
+transcript cache, single-pass decoding, silence-aware chunking and the
+parallel chunk workers used by both Castellanator scripts.
+
+Author: IA-ismo LAB
+"""
+
+import audio_decode
+import chunk_transcriber
+import metrics
+import model_registry
+import segmentation
+import transcript_cache
+
+# Settings read from config.ini, with the values used when a key is missing
+DEFAULT_SETTINGS = {
+    'chunk_size_minutes': 20.0,
+    'stream_chunk_seconds': 300.0,
+    'transcribe_workers': 1,
+    'mmap_audio_minutes': 60.0,
+    'skip_silence': True,
+    'silence_threshold_db': -45.0,
+    'skip_silence_seconds': 2.0,
+    'transcript_cache': True,
+}
+
+# Settings that change the transcript and therefore belong in the cache key
+_CACHE_KEY_SETTINGS = ('chunk_size_minutes', 'stream_chunk_seconds', 'skip_silence',
+                       'silence_threshold_db', 'skip_silence_seconds')
+
+def settings_from_config(config, section='DEFAULT'):
+    """Read transcription settings from a ConfigParser."""
+    settings = {}
+    for key, default in DEFAULT_SETTINGS.items():
+        if isinstance(default, bool):
+            settings[key] = config.getboolean(section, key, fallback=default)
+        elif isinstance(default, int):
+            settings[key] = config.getint(section, key, fallback=default)
+        else:
+            settings[key] = config.getfloat(section, key, fallback=default)
+    return settings
+
+def format_timestamp(seconds):
+    """Format seconds as MM:SS.mmm (or HH:MM:SS.mmm) like Whisper's verbose output."""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    if hours:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+    return f"{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+def _segment(segment):
+    """Reduce a Whisper segment to the fields streamed to consumers."""
+    return {'text': segment['text'].strip(), 'start': segment['start'], 'end': segment['end']}
+
+def transcribe_segments(audio_path, model='small', language=None, device='cpu', settings=None):
+    """Yield transcript segments as dicts with text, start and end.
+
+    Segments arrive chunk by chunk with timestamps on the original timeline.
+    The full result is stored in the transcript cache once the generator has
+    been consumed to the end; a cache hit replays the stored segments.
+    """
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+
+    # Check the transcript cache before decoding or loading any model
+    cache_key = None
+    if settings['transcript_cache']:
+        options = {key: settings[key] for key in _CACHE_KEY_SETTINGS}
+        cache_key = transcript_cache.transcript_key(audio_path, model, language, options)
+        cached = transcript_cache.lookup(cache_key)
+        if cached is not None:
+            print("♻️  Transcript found in cache, skipping transcription.")
+            metrics.Stage('transcribe', cached=1).close()
+            for segment in cached['segments']:
+                yield _segment(segment)
+            return
+
+    segments = []
+    texts = []
+    detected_language = language
+    # Only time spent decoding and transcribing counts, not waits on the consumer
+    timer = metrics.Stage('transcribe')
+    timer.start()
+
+    # Decode once to 16 kHz PCM; long inputs are memory-mapped from temp/
+    with audio_decode.decoded_audio(audio_path, mmap_minutes=settings['mmap_audio_minutes']) as audio:
+        duration_minutes = audio_decode.duration_seconds(audio) / 60
+        timer.add(audio_seconds=audio_decode.duration_seconds(audio))
+        print(f"Audio duration: {duration_minutes:.1f} minutes")
+
+        # The smaller of the two settings wins: small chunks give the first
+        # segments quickly, and chunk_size_minutes stays an upper limit
+        max_chunk_seconds = min(settings['chunk_size_minutes'] * 60, settings['stream_chunk_seconds'])
+        if settings['skip_silence']:
+            # Cut on pauses and leave dead air out of the decoder entirely
+            spans = segmentation.plan_chunks(
+                audio, max_chunk_seconds,
+                skip_silence_seconds=settings['skip_silence_seconds'],
+                threshold_db=settings['silence_threshold_db'],
+            )
+            speech_minutes = segmentation.speech_seconds(spans) / 60
+            print(f"Speech detected: {speech_minutes:.1f} of {duration_minutes:.1f} minutes")
+        else:
+            spans = audio_decode.fixed_spans(len(audio), max_chunk_seconds * audio_decode.SAMPLE_RATE)
+
+        if not spans:
+            print("No speech detected in audio.")
+
+        workers = settings['transcribe_workers']
+        chunks = audio_decode.chunk_views(audio, spans, shareable=workers > 1)
+        options = {'language': language} if language else {}
+        results = chunk_transcriber.iter_transcribe_chunks(
+            chunks, model_name=model, device=device, workers=workers, options=options
+        )
+        timer.stop()
+        for result, (start, _) in zip(metrics.timed(results, timer), spans):
+            segmentation.offset_result(result, start / audio_decode.SAMPLE_RATE)
+            detected_language = detected_language or result.get('language')
+            texts.append(result['text'].strip())
+            for segment in result.get('segments', []):
+                segments.append(segment)
+                yield _segment(segment)
+
+    if cache_key:
+        transcript_cache.store(cache_key, {
+            'text': " ".join(text for text in texts if text),
+            'segments': segments,
+            'language': detected_language,
+        })
+
+def transcribe_url_segments(url, model='small', language=None, device='cpu', settings=None,
+                            audio_format='bestaudio/best'):
+    """Yield transcript segments of a URL's audio while it is still downloading.
+
+    The download is decoded into a rolling PCM buffer and transcribed one
+    window (stream_chunk_seconds) at a time. The audio is never written to
+    disk, so the transcript cache does not apply here.
+    """
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    window_seconds = min(settings['chunk_size_minutes'] * 60, settings['stream_chunk_seconds'])
+    options = {'verbose': False}
+    if language:
+        options['language'] = language
+
+    blocks = audio_decode.stream_url_pcm(url, audio_format)
+    timer = metrics.Stage('transcribe')
+    try:
+        with model_registry.use_model(model, device) as whisper_model:
+            for start, samples in segmentation.rolling_windows(blocks, window_seconds):
+                print(f"Transcribing streamed audio from {format_timestamp(start / audio_decode.SAMPLE_RATE)}...")
+                timer.add(audio_seconds=len(samples) / audio_decode.SAMPLE_RATE)
+                if settings['skip_silence']:
+                    spans = segmentation.plan_chunks(
+                        samples, window_seconds,
+                        skip_silence_seconds=settings['skip_silence_seconds'],
+                        threshold_db=settings['silence_threshold_db'],
+                    )
+                else:
+                    spans = [(0, len(samples))]
+                for span_start, span_end in spans:
+                    with timer:
+                        result = whisper_model.transcribe(samples[span_start:span_end], **options)
+                    # Detect the language once and reuse it for the rest of the stream
+                    if 'language' not in options and result.get('language'):
+                        options['language'] = result['language']
+                    segmentation.offset_result(result, (start + span_start) / audio_decode.SAMPLE_RATE)
+                    for segment in result.get('segments', []):
+                        yield _segment(segment)
+    finally:
+        timer.close()
+        blocks.close()
+
+def transcribe_to_text(audio_path, model='small', language=None, device='cpu', settings=None,
+                       transcript_path=None, on_segment=None, verbose=True):
+    """Consume transcribe_segments and return the full transcript text.
+
+    Each segment is appended to transcript_path as it arrives (so the file
+    fills up while Whisper is still working) and handed to on_segment.
+    """
+    transcript_file = open(transcript_path, 'w', encoding='utf-8') if transcript_path else None
+    texts = []
+    try:
+        for segment in transcribe_segments(audio_path, model, language, device, settings):
+            text = segment['text']
+            if not text:
+                continue
+            if verbose:
+                print(f"[{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}] {text}")
+            if transcript_file:
+                transcript_file.write((" " if texts else "") + text)
+                transcript_file.flush()
+            texts.append(text)
+            if on_segment:
+                on_segment(segment)
+    finally:
+        if transcript_file:
+            transcript_file.close()
+    return " ".join(texts)
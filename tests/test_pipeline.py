@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+import checkpoint
+import pipeline
+
+
+def transcription(count, produced):
+    for n in range(count):
+        produced.append(n)
+        yield f"segment {n}"
+
+
+def test_failing_stage_lets_the_tracked_source_finish(tmp_path):
+    stages = checkpoint.Checkpoint(str(tmp_path), job={'type': 'test'})
+    produced = []
+    source = stages.track('transcribe', 'inputs', transcription(20, produced), {})
+
+    def translate(item):
+        if item == "segment 2":
+            raise RuntimeError("translation backend down")
+        return item
+
+    with pytest.raises(pipeline.PipelineError):
+        pipeline.run_pipeline(source, [('translate', translate)], queue_size=1, finish_source=True)
+
+    # The whole source ran, so the transcribe stage is reusable on resume
+    assert produced == list(range(20))
+    assert stages.finished('transcribe', 'inputs') == {}
+
+
+def test_closed_tracked_source_is_interrupted_not_failed(tmp_path):
+    stages = checkpoint.Checkpoint(str(tmp_path), job={'type': 'test'})
+    produced = []
+    source = stages.track('transcribe', 'inputs', transcription(20, produced), {})
+
+    with pytest.raises(pipeline.PipelineError):
+        pipeline.run_pipeline(source, [('translate', lambda item: 1 / 0)], queue_size=1)
+
+    assert len(produced) < 20
+    with open(tmp_path / checkpoint.FILENAME, encoding='utf-8') as f:
+        record = json.load(f)['stages']['transcribe']
+    assert record['status'] == 'interrupted'
+    assert not record.get('error')
@@ -0,0 +1,67 @@
+import re
+import types
+
+import translation_engine
+import translation_memory
+
+
+class WrappingModel:
+    """Gemini stand-in that answers batch prompts with wrapped, multi-line entries."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, request_options=None):
+        self.prompts.append(prompt)
+        items = re.findall(r'^\[(\d+)\] (.*)$', prompt, re.MULTILINE)
+        reply = "\n".join(f"[{n}] ES {text[:12]}\ncontinued {n}." for n, text in items)
+        return types.SimpleNamespace(text=reply)
+
+
+def gemini_backend(model):
+    backend = translation_engine.GeminiBackend.__new__(translation_engine.GeminiBackend)
+    backend.model_name = 'test-model'
+    backend.model = model
+    backend.scheduler = None
+    return backend
+
+
+def test_parse_batch_response_keeps_continuation_lines():
+    reply = "[1] Línea uno de un PDF\nenvuelta aquí.\n[2] Segundo."
+    assert translation_engine.parse_batch_response(reply, 2) == [
+        "Línea uno de un PDF envuelta aquí.", "Segundo."]
+
+
+def test_parse_batch_response_still_rejects_missing_numbers():
+    try:
+        translation_engine.parse_batch_response("[1] Uno.\nsin número", 2)
+    except ValueError:
+        return
+    raise AssertionError("a reply with a missing entry must raise ValueError")
+
+
+def test_split_units_are_single_line():
+    units = translation_engine.split_units("First line of a PDF\nwrapped here. Second one.")
+    assert [text for _, text in units] == ["First line of a PDF wrapped here.", "Second one."]
+
+
+def test_multiline_reply_is_stored_whole_in_memory(tmp_path):
+    model = WrappingModel()
+    memory = translation_memory.TranslationMemory(str(tmp_path / "memory.sqlite"))
+    text = "First line of a PDF\nwrapped here. Second sentence."
+    result = translation_engine.translate_with_memory(text, gemini_backend(model), memory, concurrency=1)
+
+    # The prompt sends one line per unit and the wrapped answers come back whole
+    assert "[1] First line of a PDF wrapped here." in model.prompts[0]
+    assert result == "ES First line o continued 1. ES Second sente continued 2."
+
+    # A second run is served from memory with the full translations
+    again = translation_engine.translate_with_memory(text, gemini_backend(model), memory, concurrency=1)
+    assert again == result
+    assert len(model.prompts) == 1
+
+
+def test_split_sentences_keeps_closing_quotes_and_brackets():
+    text = 'He said "Stop." Then he left (quietly.) «¿Qué?» Fin.'
+    assert translation_engine.split_sentences(text) == [
+        'He said "Stop."', 'Then he left (quietly.)', '«¿Qué?»', 'Fin.']
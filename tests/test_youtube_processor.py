@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+pytest.importorskip("whisper")
+pytest.importorskip("yt_dlp")
+
+import checkpoint  # noqa: E402
+import pipeline  # noqa: E402
+import stream_transcriber  # noqa: E402
+import translation_engine  # noqa: E402
+import youtube_audio_processor as processor  # noqa: E402
+
+SEGMENTS = 20
+
+
+def offline_config(tmp_path):
+    config = processor.load_config(str(tmp_path / "missing.ini"))
+    for key, value in {
+        'pipeline_mode': 'true', 'pipeline_block_chars': '10', 'pipeline_queue_size': '1',
+        'translation_backend': 'stub', 'translation_memory': 'false',
+        'tts_backend': 'fake', 'tts_cache': 'false', 'metrics': 'false',
+    }.items():
+        config.set('DEFAULT', key, value)
+    return config
+
+
+def test_pipelined_translation_failure_keeps_the_whole_transcript(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(b"RIFF fake audio")
+    monkeypatch.setattr(processor, 'fetch_audio', lambda url, base, config: str(audio))
+
+    whisper_runs = []
+
+    def transcribe_segments(*args, **kwargs):
+        whisper_runs.append(args)
+        for n in range(SEGMENTS):
+            yield {'text': f"Sentence {n}."}
+
+    monkeypatch.setattr(stream_transcriber, 'transcribe_segments', transcribe_segments)
+
+    real_translate = translation_engine.translate_text
+    calls = []
+
+    def failing_translate(text, *args, **kwargs):
+        calls.append(text)
+        if len(calls) == 2:
+            raise RuntimeError("translation backend down")
+        return real_translate(text, *args, **kwargs)
+
+    monkeypatch.setattr(translation_engine, 'translate_text', failing_translate)
+    folder = str(tmp_path / "job")
+    os.makedirs(folder)
+    config = offline_config(tmp_path)
+
+    with pytest.raises(pipeline.PipelineError):
+        processor.process_youtube('key', config, url='https://youtu.be/abcdefghijk', process_folder=folder)
+
+    transcript = (tmp_path / "job" / "transcript.txt").read_text(encoding='utf-8')
+    assert transcript.count("Sentence") == SEGMENTS
+    assert checkpoint.load(folder)['stages']['transcribe']['status'] == 'done'
+
+    # The resume translates and voices the saved transcript without running Whisper again
+    monkeypatch.setattr(translation_engine, 'translate_text', real_translate)
+    outputs = processor.resume_job('key', folder, config)
+    assert len(whisper_runs) == 1
+    assert os.path.getsize(outputs['output']) > 0
+
+
+def test_no_speech_fails_instead_of_writing_empty_audio(tmp_path):
+    folder = tmp_path / "job"
+    folder.mkdir()
+    with pytest.raises(RuntimeError, match="No speech"):
+        processor.translate_and_speak(iter([]), str(folder), 'key', offline_config(tmp_path))
+    assert not (folder / "output.mp3").exists()
@@ -0,0 +1,50 @@
+"""
+♻️ Transcript Cache - Reuse Whisper results for audio already transcribed
+
+Full `model.transcribe` results (text and segments) are stored on disk,
+keyed by the SHA-256 of the source audio file, the Whisper model, the
+language and the decoding options. A hit skips both the model load and the
+transcription.
+
+Author: IA-ismo LAB
+"""
+
+import json
+import os
+
+from disk_cache import CACHE_ROOT, DiskCache, file_digest, make_key
+
+DEFAULT_MAX_MB = 2048
+
+_cache = DiskCache(os.path.join(CACHE_ROOT, "transcripts"), DEFAULT_MAX_MB * 1024 * 1024, suffix=".json")
+
+def configure(max_mb=DEFAULT_MAX_MB, directory=None):
+    """Set the size limit (and optionally the folder) of the cache."""
+    _cache.max_bytes = int(float(max_mb) * 1024 * 1024)
+    if directory:
+        _cache.directory = directory
+
+def transcript_key(audio_path, model, language=None, options=None):
+    """Build the cache key for one transcription request."""
+    return make_key("transcript", file_digest(audio_path), model, language, options or {})
+
+def lookup(key):
+    """Return the cached Whisper result for key, or None."""
+    data = _cache.get(key)
+    if data is None:
+        return None
+    try:
+        return json.loads(data.decode('utf-8'))
+    except ValueError:
+        return None
+
+def store(key, result):
+    """Save a Whisper result (text and segments) under key."""
+    payload = {
+        'text': result.get('text', ''),
+        'segments': result.get('segments', []),
+        'language': result.get('language'),
+    }
+    # numpy scalars can slip into segments; store them as plain floats
+    data = json.dumps(payload, ensure_ascii=False, default=float)
+    _cache.put(key, data.encode('utf-8'))
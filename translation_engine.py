@@ -0,0 +1,416 @@
+"""
+🌍 Translation Engine - Token-budgeted, concurrent chunked translation
+
+Long texts are split on paragraph and sentence boundaries into chunks that
+fit a token budget, translated concurrently and put back together in the
+original order. Backends are small objects with a `translate` method, so
+the Gemini API can be swapped for a local stub in tests and benchmarks.
+
+Author: IA-ismo LAB
+"""
+
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+import rate_limiter
+import translation_memory
+
+DEFAULT_CHUNK_TOKENS = 2000
+DEFAULT_CONCURRENCY = 4
+
+# Bump when the prompts change so stored translations are not reused
+# (2: units are single-line and multi-line replies are parsed whole)
+PROMPT_VERSION = 2
+
+LANGUAGE_NAMES = {
+    'en': 'English',
+    'es': 'Spanish',
+    'fr': 'French',
+    'de': 'German',
+    'it': 'Italian',
+    'pt': 'Portuguese',
+    'ca': 'Catalan',
+    'gl': 'Galician',
+    'eu': 'Basque',
+}
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+# Closing quotes and brackets are captured so they stay with their sentence
+_SENTENCE_END = re.compile(r'(?<=[.!?…。！？])(["\'”’»)\]]*)\s+')
+
+def language_name(code):
+    """Return the English name of a language code for use in prompts."""
+    return LANGUAGE_NAMES.get(code, code)
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)."""
+    return math.ceil(len(text) / 4)
+
+def split_sentences(text):
+    """Split text into sentences, keeping their punctuation."""
+    parts = _SENTENCE_END.split(text)
+    # split() alternates sentence, closers, sentence, ...; glue each closer back on
+    sentences = [body + closers for body, closers in zip(parts[::2], parts[1::2] + [""])]
+    return [sentence.strip() for sentence in sentences if sentence.strip()]
+
+def _hard_split(text, max_chars):
+    """Split an over-long sentence on whitespace."""
+    pieces = []
+    current = []
+    length = 0
+    for word in text.split():
+        if current and length + len(word) + 1 > max_chars:
+            pieces.append(" ".join(current))
+            current = []
+            length = 0
+        current.append(word)
+        length += len(word) + 1
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+def split_text(text, max_tokens=DEFAULT_CHUNK_TOKENS):
+    """Split text into chunks within a token budget.
+
+    Returns a list of (separator, chunk) pairs, where separator is the text
+    that joined the chunk to the previous one ("\\n\\n" between paragraphs,
+    " " inside a paragraph). reassemble() uses it to restore the layout.
+    """
+    max_chars = max(1, max_tokens * 4)
+    chunks = []
+    current = []
+    current_length = 0
+    current_separator = ""
+
+    def flush():
+        nonlocal current, current_length
+        if current:
+            chunks.append((current_separator, "".join(current)))
+        current = []
+        current_length = 0
+
+    for paragraph_index, paragraph in enumerate(_PARAGRAPH_BREAK.split(text.strip())):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        separator = "\n\n" if paragraph_index else ""
+
+        # Whole paragraphs are packed together while they fit
+        if len(paragraph) <= max_chars:
+            if current and current_length + len(separator) + len(paragraph) > max_chars:
+                flush()
+            if not current:
+                current_separator = separator if chunks else ""
+                current.append(paragraph)
+            else:
+                current.append(separator + paragraph)
+            current_length += len(separator) + len(paragraph)
+            continue
+
+        # Otherwise fall back to sentences (and words for run-on sentences)
+        sentences = []
+        for sentence in split_sentences(paragraph):
+            sentences.extend(_hard_split(sentence, max_chars) if len(sentence) > max_chars else [sentence])
+        for sentence_index, sentence in enumerate(sentences):
+            joiner = separator if sentence_index == 0 else " "
+            if current and current_length + len(joiner) + len(sentence) > max_chars:
+                flush()
+            if not current:
+                current_separator = joiner if chunks else ""
+                current.append(sentence)
+            else:
+                current.append(joiner + sentence)
+            current_length += len(joiner) + len(sentence)
+
+    flush()
+    return chunks
+
+def split_units(text, max_tokens=DEFAULT_CHUNK_TOKENS):
+    """Split text into sentence units as (separator, sentence) pairs.
+
+    These are the units stored in the translation memory; the separators
+    restore paragraph breaks when the translations are joined again.
+    """
+    max_chars = max(1, max_tokens * 4)
+    units = []
+    for paragraph_index, paragraph in enumerate(_PARAGRAPH_BREAK.split(text.strip())):
+        first = True
+        for sentence in split_sentences(paragraph):
+            pieces = _hard_split(sentence, max_chars) if len(sentence) > max_chars else [sentence]
+            for piece in pieces:
+                # One line per unit, so the numbered batch prompt stays line-based
+                piece = " ".join(piece.split())
+                if not units:
+                    separator = ""
+                elif first and paragraph_index:
+                    separator = "\n\n"
+                else:
+                    separator = " "
+                units.append((separator, piece))
+                first = False
+    return units
+
+def pack_units(texts, max_tokens=DEFAULT_CHUNK_TOKENS):
+    """Group texts into batches whose combined size fits the token budget."""
+    max_chars = max(1, max_tokens * 4)
+    batches = []
+    current = []
+    length = 0
+    for text in texts:
+        if current and length + len(text) + 8 > max_chars:
+            batches.append(current)
+            current = []
+            length = 0
+        current.append(text)
+        length += len(text) + 8  # Room for the "[n] " numbering
+    if current:
+        batches.append(current)
+    return batches
+
+def reassemble(chunks, translations):
+    """Join translated chunks using the separators recorded by split_text."""
+    return "".join(separator + translation.strip()
+                   for (separator, _), translation in zip(chunks, translations))
+
+def build_prompt(text, target_lang='es', source_lang='en'):
+    """Build the translation prompt sent to the language model."""
+    source = language_name(source_lang)
+    target = language_name(target_lang)
+    return (f"Translate the following {source} text to {target}.\n"
+            "Provide only the translation, without any additional comments or explanations.\n"
+            "Keep the paragraph breaks of the original.\n\n"
+            f"Text to translate:\n{text}\n\n"
+            f"{target} translation:")
+
+def build_batch_prompt(texts, target_lang='es', source_lang='en'):
+    """Build a prompt that translates numbered lines one-to-one."""
+    source = language_name(source_lang)
+    target = language_name(target_lang)
+    numbered = "\n".join(f"[{i}] {text}" for i, text in enumerate(texts, 1))
+    return (f"Translate each numbered line of the following {source} text to {target}.\n"
+            "Return exactly one line per input line, starting with the same [n] number.\n"
+            "Provide only the translation, without any additional comments or explanations.\n\n"
+            f"{numbered}")
+
+def parse_batch_response(response_text, expected):
+    """Parse numbered lines back into a list; raise ValueError on mismatch.
+
+    Lines without a [n] number continue the previous entry, so a
+    translation the model wrapped over several lines is kept whole.
+    """
+    translations = {}
+    current = None
+    for line in response_text.splitlines():
+        match = re.match(r'^\s*\[(\d+)\]\s*(.*)$', line)
+        if match:
+            current = int(match.group(1))
+            translations[current] = match.group(2).strip()
+        elif current is not None and line.strip():
+            translations[current] = f"{translations[current]} {line.strip()}".strip()
+    if sorted(translations) != list(range(1, expected + 1)):
+        raise ValueError(f"Expected {expected} numbered lines, got {len(translations)}")
+    return [translations[i] for i in range(1, expected + 1)]
+
+class GeminiBackend:
+    """Translate through the Google Gemini API."""
+
+    name = "gemini"
+
+    def __init__(self, api_key=None, model_name='gemini-1.5-flash', scheduler=None):
+        from google import generativeai as genai
+        if api_key:
+            genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.scheduler = scheduler
+
+    def _generate(self, prompt):
+        """Send one prompt, paced and retried by the scheduler if there is one."""
+        if self.scheduler is None:
+            return self.model.generate_content(prompt).text
+
+        def request(timeout):
+            return self.model.generate_content(prompt, request_options={'timeout': timeout}).text
+
+        # Budget for the prompt plus a translation of about the same length
+        return self.scheduler.call(request, tokens=2 * estimate_tokens(prompt))
+
+    def translate(self, text, target_lang='es', source_lang='en'):
+        """Translate one chunk and return the translated text."""
+        return self._generate(build_prompt(text, target_lang, source_lang)).strip()
+
+    def translate_batch(self, texts, target_lang='es', source_lang='en'):
+        """Translate several sentences in one request, one result per input."""
+        response_text = self._generate(build_batch_prompt(texts, target_lang, source_lang))
+        return parse_batch_response(response_text, len(texts))
+
+class StubBackend:
+    """Offline backend for tests: tags the text instead of translating it."""
+
+    name = "stub"
+
+    def __init__(self, latency=0.0, model_name='stub'):
+        self.latency = latency
+        self.model_name = model_name
+        self.calls = 0
+
+    def translate(self, text, target_lang='es', source_lang='en'):
+        """Return the text prefixed with the target language after a delay."""
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return f"[{target_lang}] {text}"
+
+    def translate_batch(self, texts, target_lang='es', source_lang='en'):
+        """Translate several sentences in one simulated request."""
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [f"[{target_lang}] {text}" for text in texts]
+
+def get_backend(name='gemini', api_key=None, model_name='gemini-1.5-flash', latency=0.0, scheduler=None):
+    """Create a translation backend by name ('gemini' or 'stub')."""
+    if name == 'stub':
+        return StubBackend(latency=latency)
+    if name == 'gemini':
+        return GeminiBackend(api_key=api_key, model_name=model_name, scheduler=scheduler)
+    raise ValueError(f"Unknown translation backend: {name}")
+
+def scheduler_from_config(config, section='DEFAULT'):
+    """Return the shared Gemini request scheduler configured from config.ini."""
+    return rate_limiter.get_scheduler(
+        'gemini',
+        requests_per_minute=config.getfloat(section, 'gemini_requests_per_minute', fallback=15),
+        tokens_per_minute=config.getfloat(section, 'gemini_tokens_per_minute', fallback=1000000),
+        max_retries=config.getint(section, 'translation_max_retries', fallback=5),
+        request_timeout=config.getfloat(section, 'translation_timeout_seconds', fallback=120),
+        deadline_seconds=config.getfloat(section, 'translation_deadline_seconds', fallback=600),
+    )
+
+def backend_from_config(config, api_key=None, model_name='gemini-1.5-flash', section='DEFAULT'):
+    """Create the backend selected by translation_backend in config.ini."""
+    name = config.get(section, 'translation_backend', fallback='gemini')
+    latency = config.getfloat(section, 'stub_latency_seconds', fallback=0.0)
+    scheduler = scheduler_from_config(config, section) if name == 'gemini' else None
+    return get_backend(name, api_key=api_key, model_name=model_name, latency=latency, scheduler=scheduler)
+
+def settings_from_config(config, section='DEFAULT'):
+    """Read chunking, concurrency and translation memory settings from a ConfigParser."""
+    memory = None
+    if config.getboolean(section, 'translation_memory', fallback=True):
+        path = config.get(section, 'translation_memory_path', fallback=translation_memory.DEFAULT_PATH)
+        memory = translation_memory.open_memory(path)
+    return {
+        'max_tokens': config.getint(section, 'translation_chunk_tokens', fallback=DEFAULT_CHUNK_TOKENS),
+        'concurrency': config.getint(section, 'translation_concurrency', fallback=DEFAULT_CONCURRENCY),
+        'memory': memory,
+    }
+
+def _timed_call(backend, method, *args):
+    """Call a backend method and record its latency.
+
+    Backends behind a RequestScheduler are left to it: it records each
+    attempt without the rate-limit waits and backoff around it.
+    """
+    if getattr(backend, 'scheduler', None) is not None:
+        return getattr(backend, method)(*args)
+    started = time.perf_counter()
+    try:
+        result = getattr(backend, method)(*args)
+    except Exception:
+        metrics.api_call(backend.name, time.perf_counter() - started, failed=True)
+        raise
+    metrics.api_call(backend.name, time.perf_counter() - started)
+    return result
+
+def _translate_batch_safely(backend, texts, target_lang, source_lang):
+    """Translate a batch, falling back to one request per text if the reply is malformed."""
+    try:
+        return _timed_call(backend, 'translate_batch', texts, target_lang, source_lang)
+    except ValueError as e:
+        print(f"⚠️  Batch reply did not line up ({e}); translating sentences one by one")
+        return [_timed_call(backend, 'translate', text, target_lang, source_lang) for text in texts]
+
+def translate_with_memory(text, backend, memory, target_lang='es', source_lang='en',
+                          max_tokens=DEFAULT_CHUNK_TOKENS, concurrency=DEFAULT_CONCURRENCY):
+    """Translate sentence by sentence, sending only memory misses to the backend."""
+    units = split_units(text, max_tokens)
+    if not units:
+        return ""
+    model = getattr(backend, 'model_name', backend.name)
+    hashes = [translation_memory.segment_hash(sentence) for _, sentence in units]
+    known = memory.lookup_many(hashes, target_lang, model, PROMPT_VERSION)
+
+    # Each distinct missing sentence is translated once, even if repeated
+    missing = {}
+    for digest, (_, sentence) in zip(hashes, units):
+        if digest not in known and digest not in missing:
+            missing[digest] = sentence
+    print(f"🧠 Translation memory: {len(units) - sum(1 for h in hashes if h not in known)}"
+          f"/{len(units)} sentences reused, {len(missing)} to translate")
+
+    if missing:
+        digests = list(missing)
+        batches = pack_units([missing[d] for d in digests], max_tokens)
+        total = len(batches)
+        print(f"Translating {total} chunk(s) with up to {min(concurrency, total)} concurrent requests...")
+
+        def translate_batch(indexed):
+            index, batch = indexed
+            translations = _translate_batch_safely(backend, batch, target_lang, source_lang)
+            print(f"Translated chunk {index + 1}/{total}")
+            return translations
+
+        if total == 1 or concurrency <= 1:
+            results = [translate_batch(item) for item in enumerate(batches)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(concurrency, total)) as pool:
+                results = list(pool.map(metrics.bind(translate_batch), enumerate(batches)))
+
+        translated = [translation for batch in results for translation in batch]
+        new_items = [(digest, missing[digest], translation)
+                     for digest, translation in zip(digests, translated)]
+        memory.store_many(new_items, target_lang, model, PROMPT_VERSION)
+        known.update((digest, translation) for digest, _, translation in new_items)
+
+    return "".join(separator + known[digest].strip()
+                   for digest, (separator, _) in zip(hashes, units))
+
+def translate_text(text, backend, target_lang='es', source_lang='en',
+                   max_tokens=DEFAULT_CHUNK_TOKENS, concurrency=DEFAULT_CONCURRENCY, memory=None):
+    """Translate text chunk by chunk with up to `concurrency` requests in flight.
+
+    With a translation memory, text is handled sentence by sentence and
+    only sentences not translated before are sent to the backend.
+    """
+    with metrics.stage('translate', chars_in=len(text)) as timer:
+        translated = _translate_text(text, backend, target_lang, source_lang, max_tokens, concurrency, memory)
+        timer.add(chars_out=len(translated))
+    return translated
+
+def _translate_text(text, backend, target_lang, source_lang, max_tokens, concurrency, memory):
+    """translate_text without the stage measurement."""
+    if memory is not None:
+        return translate_with_memory(text, backend, memory, target_lang, source_lang,
+                                     max_tokens, concurrency)
+    chunks = split_text(text, max_tokens)
+    if not chunks:
+        return ""
+    total = len(chunks)
+    print(f"Translating {total} chunk(s) with up to {min(concurrency, total)} concurrent requests...")
+
+    def translate_chunk(indexed):
+        index, (_, chunk) = indexed
+        translation = _timed_call(backend, 'translate', chunk, target_lang, source_lang)
+        print(f"Translated chunk {index + 1}/{total}")
+        return translation
+
+    if total == 1 or concurrency <= 1:
+        translations = [translate_chunk(item) for item in enumerate(chunks)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, total)) as pool:
+            translations = list(pool.map(metrics.bind(translate_chunk), enumerate(chunks)))
+    return reassemble(chunks, translations)
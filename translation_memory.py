@@ -0,0 +1,134 @@
+"""
+🧠 Translation Memory - Sentence-level SQLite store of past translations
+
+Every sentence sent for translation is normalised and hashed, and its
+translation is stored keyed by (source hash, target language, model,
+prompt version). Repeated text such as podcast intros, recurring PDF
+boilerplate or a re-run of a finished job is served from the store and
+only the misses reach the API.
+
+Author: IA-ismo LAB
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from disk_cache import CACHE_ROOT
+
+DEFAULT_PATH = os.path.join(CACHE_ROOT, "translation_memory.sqlite")
+
+_memories = {}
+_memories_lock = threading.Lock()
+
+def normalize(text):
+    """Normalise a segment so trivial whitespace differences still match."""
+    text = unicodedata.normalize('NFC', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def segment_hash(text):
+    """SHA-256 of the normalised segment."""
+    return hashlib.sha256(normalize(text).encode('utf-8')).hexdigest()
+
+class TranslationMemory:
+    """SQLite-backed store of translated segments with hit/miss counters."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS segments (
+                    source_hash TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_version INTEGER NOT NULL,
+                    source_text TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (source_hash, target_lang, model, prompt_version)
+                )""")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )""")
+
+    def _bump(self, name, amount):
+        """Add amount to a persistent counter (caller holds the lock)."""
+        self._conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def lookup_many(self, hashes, target_lang, model, prompt_version):
+        """Return {hash: translation} for every hash already in the store."""
+        unique = list(dict.fromkeys(hashes))
+        found = {}
+        now = time.time()
+        with self._lock, self._conn:
+            # Stay under SQLite's limit on bound parameters
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT source_hash, translation FROM segments "
+                    f"WHERE target_lang = ? AND model = ? AND prompt_version = ? "
+                    f"AND source_hash IN ({placeholders})",
+                    [target_lang, model, prompt_version] + batch,
+                ).fetchall()
+                found.update(rows)
+            if found:
+                self._conn.executemany(
+                    "UPDATE segments SET hits = hits + 1, last_used = ? "
+                    "WHERE source_hash = ? AND target_lang = ? AND model = ? AND prompt_version = ?",
+                    [(now, h, target_lang, model, prompt_version) for h in found],
+                )
+            self._bump('hits', len(found))
+            self._bump('misses', len(unique) - len(found))
+        return found
+
+    def store_many(self, items, target_lang, model, prompt_version):
+        """Store (hash, source_text, translation) triples."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO segments "
+                "(source_hash, target_lang, model, prompt_version, source_text, translation, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(h, target_lang, model, prompt_version, normalize(source), translation, now, now)
+                 for h, source, translation in items],
+            )
+
+    def stats(self):
+        """Return lifetime hit/miss counts and the number of stored segments."""
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            size = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        return {'hits': counters.get('hits', 0), 'misses': counters.get('misses', 0), 'segments': size}
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+def open_memory(path=DEFAULT_PATH):
+    """Return the shared TranslationMemory for a database path."""
+    with _memories_lock:
+        memory = _memories.get(path)
+        if memory is None:
+            memory = TranslationMemory(path)
+            _memories[path] = memory
+        return memory
@@ -0,0 +1,37 @@
+"""
+🎙️ TTS Cache - Reuse speech already synthesized
+
+Synthesized MP3 clips are stored on disk, keyed by the hash of the
+normalised text, the backend, the voice, the language and the speed.
+Repeated phrases and re-runs of a job are served from disk instead of
+being synthesized again.
+
+Author: IA-ismo LAB
+"""
+
+import os
+
+from disk_cache import CACHE_ROOT, DiskCache, make_key
+from translation_memory import segment_hash
+
+DEFAULT_MAX_MB = 512
+
+_cache = DiskCache(os.path.join(CACHE_ROOT, "tts"), DEFAULT_MAX_MB * 1024 * 1024, suffix=".mp3")
+
+def configure(max_mb=DEFAULT_MAX_MB, directory=None):
+    """Set the size limit (and optionally the folder) of the cache."""
+    _cache.max_bytes = int(float(max_mb) * 1024 * 1024)
+    if directory:
+        _cache.directory = directory
+
+def clip_key(text, backend, voice, lang, speed):
+    """Build the cache key for one synthesized clip."""
+    return make_key("tts", segment_hash(text), backend, voice, lang, speed)
+
+def lookup(key):
+    """Return the cached MP3 bytes for key, or None."""
+    return _cache.get(key)
+
+def store(key, data):
+    """Save the MP3 bytes of a clip under key."""
+    _cache.put(key, data)
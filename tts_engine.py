@@ -0,0 +1,280 @@
+"""
+🔊 TTS Engine - Chunked, concurrent speech synthesis
+
+Text is split on sentence boundaries into short pieces that are
+synthesized concurrently. A failed piece is retried on its own, and the
+MP3 frames are written to the output file in order as soon as each piece
+is ready, so nothing is decoded or held in memory beyond a small window
+of pieces.
+
+Backends share one interface (name, lang, voice, speed and synthesize),
+so gTTS can be swapped for the offline espeak-ng engine, and any backend
+can be wrapped in a cache of clips already synthesized.
+
+Author: IA-ismo LAB
+"""
+
+import random
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+import tts_cache
+from translation_engine import split_sentences
+
+DEFAULT_PIECE_CHARS = 200
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+
+def split_for_speech(text, max_chars=DEFAULT_PIECE_CHARS):
+    """Split text into sentence-aligned pieces of at most max_chars."""
+    pieces = []
+    current = ""
+    for sentence in split_sentences(text.replace("\n", " ")):
+        words = sentence.split() if len(sentence) > max_chars else [sentence]
+        for word in words:
+            if current and len(current) + 1 + len(word) > max_chars:
+                pieces.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+def strip_id3(data):
+    """Drop a leading ID3v2 tag so MP3 pieces can be concatenated."""
+    if len(data) >= 10 and data[:3] == b'ID3':
+        size = 0
+        for byte in data[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        return data[10 + size + footer:]
+    return data
+
+def concat_mp3(part_paths, output_path, block_size=1024 * 1024):
+    """Concatenate MP3 files into one stream without decoding them."""
+    with open(output_path, 'wb') as output:
+        for index, part_path in enumerate(part_paths):
+            with open(part_path, 'rb') as part:
+                first = part.read(block_size)
+                output.write(first if index == 0 else strip_id3(first))
+                for block in iter(lambda: part.read(block_size), b''):
+                    output.write(block)
+    return output_path
+
+class GTTSBackend:
+    """Google Translate TTS through gTTS's public API."""
+
+    name = "gtts"
+
+    def __init__(self, lang='es', slow=False, tld='com', timeout=30):
+        self.lang = lang
+        self.slow = slow
+        self.tld = tld
+        self.voice = tld
+        self.speed = 'slow' if slow else 'normal'
+        self.timeout = timeout
+
+    def synthesize(self, text):
+        """Return the MP3 bytes for one piece of text."""
+        import io
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang, slow=self.slow, tld=self.tld, timeout=self.timeout).write_to_fp(buffer)
+        return buffer.getvalue()
+
+class FakeTTSBackend:
+    """Offline backend for tests: returns silent MP3 frames sized to the text."""
+
+    name = "fake"
+
+    # MPEG-2 Layer III, 32 kbps, 24 kHz, mono: the format gTTS returns
+    _FRAME = bytes([0xFF, 0xF3, 0x44, 0xC0]) + bytes(92)
+    _FRAME_SECONDS = 576 / 24000
+    _SECONDS_PER_CHAR = 0.066
+
+    def __init__(self, lang='es', latency=0.0, failure_rate=0.0):
+        self.lang = lang
+        self.voice = None
+        self.speed = None
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text):
+        """Return silent audio about as long as the text would take to say."""
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise ConnectionError("Simulated TTS failure")
+        frames = max(1, int(len(text) * self._SECONDS_PER_CHAR / self._FRAME_SECONDS))
+        return self._FRAME * frames
+
+class EspeakBackend:
+    """Offline speech with espeak-ng, encoded to MP3 by ffmpeg."""
+
+    name = "espeak"
+
+    def __init__(self, lang='es', voice=None, speed=160, timeout=60):
+        self.lang = lang
+        self.voice = voice or lang
+        self.speed = int(speed)
+        self.timeout = timeout
+        self.espeak = shutil.which('espeak-ng') or shutil.which('espeak')
+        if not self.espeak:
+            raise RuntimeError("espeak-ng is not installed")
+        if not shutil.which('ffmpeg'):
+            raise RuntimeError("ffmpeg is not installed")
+
+    def synthesize(self, text):
+        """Return the MP3 bytes for one piece of text."""
+        # Text goes in on stdin, so a piece starting with '-' is never read as an option
+        speech = subprocess.run(
+            [self.espeak, '-v', self.voice, '-s', str(self.speed), '--stdout', '--stdin'],
+            input=text.encode('utf-8'), capture_output=True, timeout=self.timeout, check=True,
+        )
+        # Same format as gTTS, without Xing or ID3 headers so pieces concatenate cleanly
+        encoded = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0',
+             '-ar', '24000', '-ac', '1', '-b:a', '32k', '-write_xing', '0',
+             '-id3v2_version', '0', '-f', 'mp3', 'pipe:1'],
+            input=speech.stdout, capture_output=True, timeout=self.timeout, check=True,
+        )
+        return encoded.stdout
+
+class CachedBackend:
+    """Wrap a backend so clips already synthesized are read from disk."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.name
+        self.lang = backend.lang
+        self.voice = backend.voice
+        self.speed = backend.speed
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text):
+        """Return cached audio for text, synthesizing and storing it on a miss."""
+        key = tts_cache.clip_key(text, self.name, self.voice, self.lang, self.speed)
+        data = tts_cache.lookup(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is None:
+            data = _timed_synthesize(self.backend, text)
+            tts_cache.store(key, data)
+        return data
+
+def get_backend(name='gtts', lang='es', latency=0.0, voice=None, speed=None, cache=False):
+    """Create a TTS backend by name ('gtts', 'espeak' or 'fake').
+
+    With cache=True the backend is wrapped in a CachedBackend.
+    """
+    if name == 'gtts':
+        backend = GTTSBackend(lang=lang, slow=speed == 'slow', tld=voice or 'com')
+    elif name == 'espeak':
+        backend = EspeakBackend(lang=lang, voice=voice, speed=speed or 160)
+    elif name == 'fake':
+        backend = FakeTTSBackend(lang=lang, latency=latency)
+    else:
+        raise ValueError(f"Unknown TTS backend: {name}")
+    return CachedBackend(backend) if cache else backend
+
+def settings_from_config(config, section='DEFAULT'):
+    """Read piece size, concurrency and retry settings from a ConfigParser."""
+    return {
+        'max_chars': config.getint(section, 'tts_piece_chars', fallback=DEFAULT_PIECE_CHARS),
+        'concurrency': config.getint(section, 'tts_concurrency', fallback=DEFAULT_CONCURRENCY),
+        'retries': config.getint(section, 'tts_retries', fallback=DEFAULT_RETRIES),
+    }
+
+def backend_from_config(config, lang='es', section='DEFAULT'):
+    """Create the backend selected by tts_backend in config.ini."""
+    use_cache = config.getboolean(section, 'tts_cache', fallback=True)
+    if use_cache:
+        tts_cache.configure(config.getfloat(section, 'tts_cache_mb', fallback=tts_cache.DEFAULT_MAX_MB))
+    return get_backend(
+        config.get(section, 'tts_backend', fallback='gtts'),
+        lang=lang,
+        latency=config.getfloat(section, 'tts_stub_latency_seconds',
+                                fallback=config.getfloat(section, 'stub_latency_seconds', fallback=0.0)),
+        voice=config.get(section, 'tts_voice', fallback='') or None,
+        speed=config.get(section, 'tts_speed', fallback='') or None,
+        cache=use_cache,
+    )
+
+def _timed_synthesize(backend, text):
+    """Call a backend and record the request's latency."""
+    started = time.perf_counter()
+    try:
+        data = backend.synthesize(text)
+    except Exception:
+        metrics.api_call(f"tts_{backend.name}", time.perf_counter() - started, failed=True)
+        raise
+    metrics.api_call(f"tts_{backend.name}", time.perf_counter() - started)
+    return data
+
+def _synthesize_with_retries(backend, text, retries):
+    """Synthesize one piece, retrying it alone with backoff on failure."""
+    for attempt in range(retries + 1):
+        try:
+            # Cache hits are not requests; the cache times its own misses
+            if isinstance(backend, CachedBackend):
+                return backend.synthesize(text)
+            return _timed_synthesize(backend, text)
+        except Exception as e:
+            if attempt >= retries:
+                raise
+            metrics.api_retry(f"tts_{backend.name}")
+            delay = random.uniform(0, min(30.0, 2 ** attempt))
+            print(f"⚠️  TTS piece failed ({type(e).__name__}), retry {attempt + 1}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+def synthesize_to_file(text, output_path, backend, max_chars=DEFAULT_PIECE_CHARS,
+                       concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES):
+    """Synthesize text piece by piece into one MP3 file, in order.
+
+    At most a couple of windows of pieces are in flight or waiting to be
+    written, so memory stays flat however long the text is.
+    """
+    pieces = split_for_speech(text, max_chars)
+    total = len(pieces)
+    if not total:
+        raise ValueError("No text to synthesize")
+    concurrency = max(1, min(concurrency, total))
+    window = concurrency * 2
+    synthesize = metrics.bind(_synthesize_with_retries)
+
+    with metrics.stage('tts', chars_in=len(text), pieces=total) as timer, \
+            open(output_path, 'wb') as output, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = []
+        next_piece = 0
+        written = 0
+        try:
+            while written < total:
+                # Keep the window full, then write the oldest piece when it is ready
+                while next_piece < total and len(pending) < window:
+                    pending.append(pool.submit(synthesize, backend, pieces[next_piece], retries))
+                    next_piece += 1
+                data = pending.pop(0).result()
+                output.write(data if written == 0 else strip_id3(data))
+                timer.add(bytes=len(data))
+                written += 1
+                if written % 10 == 0 or written == total:
+                    print(f"🔊 Synthesized {written}/{total} pieces", end='\r' if written < total else '\n')
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    return output_path
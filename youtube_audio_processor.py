@@ -1,14 +1,55 @@
 import sys
 import os
+import itertools
+import json
+import shutil
+import threading
 import yt_dlp
-import whisper
-from google import generativeai as genai
-from gtts import gTTS
-from pydub import AudioSegment
-from pydub.utils import make_chunks
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-import PyPDF2
-import pdfplumber
+import configparser
+import checkpoint
+import disk_cache
+import media_cache
+import metrics
+import model_registry
+import pdf_cache
+import pdf_extractor
+import transcript_cache
+import stream_transcriber
+import translation_engine
+import pipeline
+import tts_engine
+
+def load_config(path='config.ini'):
+    """Load configuration from config.ini or use defaults."""
+    config = configparser.ConfigParser()
+
+    # Default settings (the DEFAULT section always exists)
+    config.set('DEFAULT', 'whisper_model', 'small')
+    config.set('DEFAULT', 'target_language', 'es')
+    config.set('DEFAULT', 'transcript_cache_mb', '2048')
+    config.set('DEFAULT', 'pipeline_mode', 'true')
+    config.set('DEFAULT', 'pipeline_block_chars', '2000')
+    config.set('DEFAULT', 'pipeline_queue_size', '2')
+    config.set('DEFAULT', 'keep_temp_files', 'true')
+    config.set('DEFAULT', 'pdf_section_pages', '20')
+    config.set('DEFAULT', 'download_concurrency', '3')
+
+    # Try to load from config file
+    if os.path.exists(path):
+        config.read(path)
+        print(f"✅ Configuration loaded from {path}")
+    else:
+        print(f"⚠️  No {path} found, using default settings")
+
+    return config
+
+def copy_config(config):
+    """Return an independent copy of a config, for per-job changes."""
+    copy = configparser.ConfigParser()
+    copy.read_dict({section: dict(config[section]) for section in config})
+    return copy
 
 def show_menu():
     """Display the main menu options."""
@@ -18,9 +59,11 @@ def show_menu():
     print("Choose what you want to process:")
     print("1. 📺 YouTube Video")
     print("2. 📄 PDF Document")
-    print("3. ❌ Exit")
+    print("3. 📚 YouTube Playlist / Channel / URL List")
+    print("4. 🔁 Resume an Unfinished Job")
+    print("5. ❌ Exit")
     print("="*50)
-    return input("Enter your choice (1-3): ").strip()
+    return input("Enter your choice (1-5): ").strip()
 
 def create_folders():
     """Create necessary folders if they don't exist."""
@@ -30,15 +73,28 @@ def create_folders():
             os.makedirs(folder)
             print(f"📁 Created folder: {folder}")
 
+def make_timestamped_folder(output_dir, prefix):
+    """Create output_dir/<prefix>_<timestamp> and return its path.
+
+    Jobs started in the same second (job runner or job service workers)
+    get a numbered folder instead of colliding.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    folder = os.path.join(output_dir, f"{prefix}_{timestamp}")
+    for n in itertools.count(2):
+        try:
+            os.makedirs(folder)
+            return folder
+        except FileExistsError:
+            folder = os.path.join(output_dir, f"{prefix}_{timestamp}_{n}")
+
 def create_process_folder():
     """Create a timestamped folder for this conversion process."""
     output_dir = "output"
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    process_folder = os.path.join(output_dir, f"castellanator_{timestamp}")
-    os.makedirs(process_folder)
+    process_folder = make_timestamped_folder(output_dir, "castellanator")
     
     # Create temp folder for this process
     temp_dir = "temp"
@@ -78,83 +134,320 @@ def select_pdf_file():
         except ValueError:
             print("❌ Please enter a valid number")
 
-def extract_text_from_pdf(pdf_path):
+def extract_text_from_pdf(pdf_path, workers=None, cache=True):
     """Extract text from PDF using pdfplumber (better for complex PDFs)."""
     print("📖 Extracting text from PDF...")
-    text = ""
-
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            print(f"📄 Processing {total_pages} pages...")
-
-            for i, page in enumerate(pdf.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-                print(f"📄 Processed page {i+1}/{total_pages}", end='\r')
-
-        print(f"\n✅ Extracted {len(text)} characters from PDF")
-        return text.strip()
-
+        text = pdf_extractor.extract_text(pdf_path, workers, cache)
+        print(f"✅ Extracted {len(text)} characters from PDF")
+        return text
     except Exception as e:
         print(f"❌ Error extracting text from PDF: {e}")
-        print("🔄 Trying alternative method with PyPDF2...")
+        return None
 
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            print(f"✅ Extracted {len(text)} characters using alternative method")
-            return text.strip()
-        except Exception as e2:
-            print(f"❌ Both extraction methods failed: {e2}")
-            return None
+def process_pdf(api_key, config=None, pdf_path=None, process_folder=None):
+    """Process a PDF file: extract text, translate, and convert to audio.
 
-def process_pdf(api_key):
-    """Process a PDF file: extract text, translate, and convert to audio."""
+    Asks for the file when pdf_path is not given. Each stage is
+    checkpointed; pass process_folder to resume an unsectioned job there. Returns a dict
+    with the process folder and the files written, or None if nothing was
+    produced.
+    """
     print("\n" + "="*50)
     print("📄 PDF Processing Mode")
     print("="*50)
 
+    if config is None:
+        config = load_config()
+
     # Select PDF file
-    pdf_path = select_pdf_file()
+    if pdf_path is None:
+        pdf_path = select_pdf_file()
     if not pdf_path:
-        return
+        return None
+
+    pdf_cache.configure(config.getfloat('DEFAULT', 'pdf_cache_mb', fallback=pdf_cache.DEFAULT_MAX_MB))
+    metrics.configure(**metrics.settings_from_config(config))
+    if process_folder is None and config.getint('DEFAULT', 'pdf_section_pages', fallback=20) > 0:
+        # Sectioned runs keep their own per-section progress in a folder named after the file
+        return process_pdf_sections(pdf_path, api_key, config)
 
     # Create process folder
-    process_folder = create_process_folder()
-    print(f"📁 Created process folder: {process_folder}")
-
-    # Step 1: Extract text from PDF
-    print("\n=== STEP 1: Extracting text from PDF ===")
-    pdf_text = extract_text_from_pdf(pdf_path)
-    if not pdf_text:
-        print("❌ Failed to extract text from PDF")
-        return
+    if process_folder is None:
+        process_folder = create_process_folder()
+        print(f"📁 Created process folder: {process_folder}")
+    else:
+        print(f"📁 Resuming process folder: {process_folder}")
+    stages = checkpoint.Checkpoint(process_folder, job={
+        'type': 'pdf', 'pdf': os.path.abspath(pdf_path),
+        'target_language': config.get('DEFAULT', 'target_language', fallback='es'),
+    })
+    stages.mark_job('running')
+    job_metrics = metrics.start_job(process_folder, type='pdf')
+    status = 'failed'
 
-    # Save original text
     original_text_path = os.path.join(process_folder, 'original_text.txt')
-    with open(original_text_path, 'w', encoding='utf-8') as f:
-        f.write(pdf_text)
-    print(f"📝 Original text saved to {original_text_path}")
+    translated_path = os.path.join(process_folder, 'translated.txt')
+    translate_inputs = stage_settings(config, TRANSLATE_KEYS)
+    tts_inputs = stage_settings(config, TTS_KEYS)
+    try:
+        # Step 1: Extract text from PDF
+        print("\n=== STEP 1: Extracting text from PDF ===")
 
-    # Step 2: Translate text
-    print("\n=== STEP 2: Translating to Spanish ===")
-    translated_text = translate_text(pdf_text, api_key)
+        def extract():
+            pdf_text = extract_text_from_pdf(pdf_path, config.getint('DEFAULT', 'pdf_workers', fallback=0) or None,
+                                             config.getboolean('DEFAULT', 'pdf_cache', fallback=True))
+            if not pdf_text:
+                raise RuntimeError("Failed to extract text from PDF")
+            with open(original_text_path, 'w', encoding='utf-8') as f:
+                f.write(pdf_text)
+            return {'original': original_text_path}
 
-    # Save translated text
-    translated_path = os.path.join(process_folder, 'translated.txt')
-    with open(translated_path, 'w', encoding='utf-8') as f:
-        f.write(translated_text)
-    print(f"🌍 Translated text saved to {translated_path}")
+        try:
+            stages.run('extract', checkpoint.inputs_key(checkpoint.file_key(pdf_path)), extract)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            stages.mark_job('failed')
+            return None
+        print(f"📝 Original text saved to {original_text_path}")
+        original_inputs = checkpoint.file_key(original_text_path)
+
+        if config.getboolean('DEFAULT', 'pipeline_mode', fallback=True):
+            # Steps 2-3 overlap: each block is voiced while the next one is translated
+            print("\n=== STEPS 2-3: Translating and generating audio (pipelined) ===")
+
+            def speak_blocks():
+                translated, audio = translate_and_speak(
+                    text_blocks(read_text(original_text_path), config), process_folder, api_key, config
+                )
+                return {'translated': translated, 'output': audio}
+
+            outputs = stages.run('translate_tts', checkpoint.inputs_key(
+                original_inputs, translate_inputs, tts_inputs), speak_blocks)
+            translated_path, spanish_audio_path = outputs['translated'], outputs['output']
+            print(f"🌍 Translated text saved to {translated_path}")
+            print(f"🔊 Spanish audio saved to {spanish_audio_path}")
+        else:
+            # Step 2: Translate text
+            print("\n=== STEP 2: Translating to Spanish ===")
+
+            def translate():
+                translated_text = translate_text(
+                    read_text(original_text_path), api_key,
+                    target_lang=config.get('DEFAULT', 'target_language', fallback='es'),
+                    backend=translation_engine.backend_from_config(config, api_key),
+                    settings=translation_engine.settings_from_config(config),
+                )
+                with open(translated_path, 'w', encoding='utf-8') as f:
+                    f.write(translated_text)
+                return {'translated': translated_path}
+
+            stages.run('translate', checkpoint.inputs_key(original_inputs, translate_inputs), translate)
+            print(f"🌍 Translated text saved to {translated_path}")
+
+            # Step 3: Generate Spanish audio
+            print("\n=== STEP 3: Generating Spanish audio ===")
+            target_lang = config.get('DEFAULT', 'target_language', fallback='es')
+
+            def speak():
+                return {'output': text_to_speech(
+                    read_text(translated_path), os.path.join(process_folder, 'output.mp3'), lang=target_lang,
+                    backend=tts_engine.backend_from_config(config, lang=target_lang),
+                    settings=tts_engine.settings_from_config(config),
+                )}
+
+            spanish_audio_path = stages.run('tts', checkpoint.inputs_key(
+                checkpoint.file_key(translated_path), tts_inputs), speak)['output']
+            print(f"🔊 Spanish audio saved to {spanish_audio_path}")
+        status = 'done'
+    except BaseException:
+        stages.mark_job('failed')
+        raise
+    finally:
+        job_metrics.finish(status)
+    stages.mark_job('done')
+
+    print("\n🎉 PDF processing completed successfully!")
+    print(f"All files saved in: {process_folder}")
+    print("Files generated:")
+    print(f"- {original_text_path} (Original PDF text)")
+    print(f"- {translated_path} (Spanish translation)")
+    print(f"- {spanish_audio_path} (Spanish audio)")
+    return {'folder': process_folder, 'original': original_text_path,
+            'translated': translated_path, 'output': spanish_audio_path}
+
+def create_pdf_folder(pdf_path, output_dir="output"):
+    """Return the folder for a sectioned PDF run.
+
+    The folder is named after the PDF's content, so running the same file
+    again resumes the earlier run instead of starting over.
+    """
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    label = "".join(c if c.isalnum() or c in "-_" else "_" for c in stem)[-40:] or "pdf"
+    key = disk_cache.file_digest(pdf_path)[:8]
+    process_folder = os.path.join(output_dir, f"castellanator_pdf_{label}_{key}")
+    if os.path.exists(process_folder):
+        print(f"📁 Resuming process folder: {process_folder}")
+    else:
+        os.makedirs(process_folder)
+        print(f"📁 Created process folder: {process_folder}")
+    return process_folder
+
+def section_settings(config):
+    """Settings that shape a section's translation and audio, for progress.json."""
+    settings = stage_settings(config, TRANSLATE_KEYS + TTS_KEYS)
+    settings['prompt_version'] = translation_engine.PROMPT_VERSION
+    return settings
+
+def load_progress(process_folder, pdf_path, section_pages, target_lang, settings=None):
+    """Load the section progress manifest, or start a new one.
+
+    A manifest written with another section size, language or translation
+    and speech settings is discarded: its sections no longer line up with
+    this run, or would keep the old translation and voice.
+    """
+    progress_path = os.path.join(process_folder, "progress.json")
+    if os.path.exists(progress_path):
+        with open(progress_path, 'r', encoding='utf-8') as f:
+            progress = json.load(f)
+        if (progress.get("section_pages") == section_pages and progress.get("target_language") == target_lang
+                and progress.get("settings") == settings):
+            return progress
+        print("⚠️  Section settings changed, starting the sections over")
+    return {
+        "source": os.path.abspath(pdf_path),
+        "section_pages": section_pages,
+        "target_language": target_lang,
+        "settings": settings,
+        "created": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "sections": {},
+    }
+
+def load_progress_section_pages(process_folder):
+    """Return the section size recorded in a folder's progress.json, or None."""
+    try:
+        with open(os.path.join(process_folder, "progress.json"), 'r', encoding='utf-8') as f:
+            return json.load(f).get("section_pages")
+    except (OSError, ValueError):
+        return None
+
+def save_progress(process_folder, progress):
+    """Write the progress manifest atomically."""
+    progress_path = os.path.join(process_folder, "progress.json")
+    temp_path = progress_path + ".tmp"
+    progress["updated"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(progress, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, progress_path)
+
+def join_text_files(paths, output_path, separator="\n\n"):
+    """Concatenate text files into one without loading them all at once."""
+    with open(output_path, 'w', encoding='utf-8') as output:
+        for i, path in enumerate(paths):
+            if i:
+                output.write(separator)
+            with open(path, 'r', encoding='utf-8') as part:
+                shutil.copyfileobj(part, output)
+    return output_path
+
+def process_pdf_sections(pdf_path, api_key, config):
+    """Extract, translate and voice a PDF section by section.
+
+    Each section of pdf_section_pages pages gets its own text and audio
+    files in sections/ as soon as it is done, and progress.json records
+    finished sections so a restarted run skips them. Only the sections in
+    flight are held in memory; the combined files are assembled from disk.
+    """
+    section_pages = config.getint('DEFAULT', 'pdf_section_pages', fallback=20)
+    target_lang = config.get('DEFAULT', 'target_language', fallback='es')
+    workers = config.getint('DEFAULT', 'pdf_workers', fallback=0) or None
+    use_cache = config.getboolean('DEFAULT', 'pdf_cache', fallback=True)
+
+    process_folder = create_pdf_folder(pdf_path)
+    sections_folder = os.path.join(process_folder, 'sections')
+    os.makedirs(sections_folder, exist_ok=True)
+    progress = load_progress(process_folder, pdf_path, section_pages, target_lang, section_settings(config))
+    stages = checkpoint.Checkpoint(process_folder, job={
+        'type': 'pdf', 'pdf': os.path.abspath(pdf_path), 'target_language': target_lang,
+        'section_pages': section_pages,
+    })
+    stages.mark_job('running')
 
-    # Step 3: Generate Spanish audio
-    print("\n=== STEP 3: Generating Spanish audio ===")
-    spanish_audio_path = text_to_speech(translated_text, os.path.join(process_folder, 'output.mp3'))
-    print(f"🔊 Spanish audio saved to {spanish_audio_path}")
+    # Digest the file once for the whole run, not once per section
+    hashes = pdf_extractor.cached_page_hashes(pdf_path) if use_cache else None
+    total_pages = len(hashes) if hashes is not None else pdf_extractor.page_count(pdf_path)
+    progress["pages"] = total_pages
+    sections = [(f"{i+1:04d}", start, min(start + section_pages, total_pages))
+                for i, start in enumerate(range(0, total_pages, section_pages))]
+    pending = [s for s in sections if progress["sections"].get(s[0], {}).get("status") != "done"]
+    print(f"📚 {total_pages} pages in {len(sections)} sections, "
+          f"{len(sections) - len(pending)} already done")
+    save_progress(process_folder, progress)
+
+    backend = translation_engine.backend_from_config(config, api_key)
+    settings = translation_engine.settings_from_config(config)
+    tts_backend = tts_engine.backend_from_config(config, lang=target_lang)
+    tts_settings = tts_engine.settings_from_config(config)
+
+    def section_path(number, name):
+        return os.path.join(sections_folder, f"section_{number}_{name}")
+
+    def extracted_sections():
+        for number, start, end in pending:
+            print(f"\n📖 Section {number}: pages {start+1}-{end}")
+            pages = pdf_extractor.extract_pages(pdf_path, workers, start, end, use_cache, hashes)
+            text = "\n".join(page for page in pages if page).strip()
+            with open(section_path(number, 'original.txt'), 'w', encoding='utf-8') as f:
+                f.write(text)
+            yield number, start, end, text
+
+    def translate_stage(item):
+        number, start, end, text = item
+        translated = translation_engine.translate_text(text, backend, target_lang=target_lang, **settings) if text else ""
+        with open(section_path(number, 'translated.txt'), 'w', encoding='utf-8') as f:
+            f.write(translated)
+        return number, start, end, translated
+
+    def speech_stage(item):
+        number, start, end, translated = item
+        audio_path = None
+        if translated.strip():
+            audio_path = text_to_speech(translated, section_path(number, 'audio.mp3'), lang=target_lang,
+                                        backend=tts_backend, settings=tts_settings)
+        progress["sections"][number] = {
+            "pages": [start + 1, end],
+            "status": "done",
+            "audio": os.path.basename(audio_path) if audio_path else None,
+            "finished": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        save_progress(process_folder, progress)
+        print(f"✅ Section {number} done")
+        return number
+
+    with metrics.job(process_folder, type='pdf', sections=len(pending)):
+        pipeline.run_pipeline(
+            extracted_sections(),
+            [('translate', translate_stage), ('tts', speech_stage)],
+            queue_size=config.getint('DEFAULT', 'pipeline_queue_size', fallback=2),
+        )
+
+    # Assemble the combined files from the finished sections on disk
+    numbers = [number for number, _, _ in sections]
+    original_text_path = join_text_files(
+        [section_path(n, 'original.txt') for n in numbers], os.path.join(process_folder, 'original_text.txt'))
+    translated_path = join_text_files(
+        [section_path(n, 'translated.txt') for n in numbers], os.path.join(process_folder, 'translated.txt'))
+    audio_parts = [os.path.join(sections_folder, progress["sections"][n]["audio"])
+                   for n in numbers if progress["sections"][n].get("audio")]
+    if not audio_parts:
+        print("❌ No text could be extracted from the PDF")
+        return None
+    spanish_audio_path = tts_engine.concat_mp3(audio_parts, os.path.join(process_folder, 'output.mp3'))
+    progress["completed"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    save_progress(process_folder, progress)
+    stages.mark_job('done')
+    if getattr(backend, 'scheduler', None):
+        print(f"📊 Gemini API: {backend.scheduler.summary()}")
 
     print("\n🎉 PDF processing completed successfully!")
     print(f"All files saved in: {process_folder}")
@@ -162,8 +455,17 @@ def process_pdf(api_key):
     print(f"- {original_text_path} (Original PDF text)")
     print(f"- {translated_path} (Spanish translation)")
     print(f"- {spanish_audio_path} (Spanish audio)")
+    print(f"- {sections_folder} (Text and audio for each section)")
+    return {'folder': process_folder, 'original': original_text_path, 'translated': translated_path,
+            'output': spanish_audio_path, 'sections': sections_folder}
+
+def download_audio(url, output_path='audio', audio_format='native', quality='192'):
+    """Download the audio track of a video.
 
-def download_audio(url, output_path='audio'):
+    'native' keeps the best audio stream as served (usually opus or m4a);
+    Whisper decodes it straight to 16 kHz PCM, so no encode pass is spent.
+    'mp3' converts it to an MP3 of the given quality for keeping.
+    """
     def progress_hook(d):
         if d['status'] == 'downloading':
             percent = d.get('_percent_str', '0%')
@@ -171,124 +473,613 @@ def download_audio(url, output_path='audio'):
             eta = d.get('_eta_str', 'N/A')
             print(f"Downloading: {percent} | Speed: {speed} | ETA: {eta}", end='\r')
         elif d['status'] == 'finished':
-            print("\nDownload completed. Converting to MP3...")
-    
+            print("\nDownload completed." + (" Converting to MP3..." if audio_format == 'mp3' else ""))
+
     ydl_opts = {
         'format': 'bestaudio/best',
-        'outtmpl': output_path,
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': '192',
-        }],
+        'outtmpl': output_path + '.%(ext)s',
+        'noplaylist': True,
         'progress_hooks': [progress_hook],
     }
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download([url])
-    return output_path + '.mp3'
-
-def transcribe_audio(audio_path, model='small'):
-    """Transcribe audio to text using Whisper."""
-    print("Loading Whisper model (this may take a moment on first run)...")
-    model = whisper.load_model(model, device='cpu')
-    
-    # Check audio duration
-    audio = AudioSegment.from_mp3(audio_path)
-    duration_minutes = len(audio) / 60000  # Convert to minutes
-    print(f"Audio duration: {duration_minutes:.1f} minutes")
-    
-    if duration_minutes > 30:
-        print("Audio is long (>30 min). Splitting into chunks for faster processing...")
-        chunk_length_ms = 20 * 60 * 1000  # 20 minutes chunks
-        chunks = make_chunks(audio, chunk_length_ms)
-        
-        full_transcript = ""
-        for i, chunk in enumerate(chunks):
-            print(f"Transcribing chunk {i+1}/{len(chunks)}...")
-            chunk_path = f"temp/temp_chunk_{i}.mp3"
-            chunk.export(chunk_path, format="mp3")
-            result = model.transcribe(chunk_path, verbose=False)
-            full_transcript += result['text'] + " "
-            os.remove(chunk_path)  # Clean up
-        
-        print("All chunks transcribed.")
-        return full_transcript.strip()
+    if audio_format == 'mp3':
+        ydl_opts['postprocessors'] = [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': str(quality),
+        }]
+    with metrics.stage('download') as timer:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=True)
+        if audio_format == 'mp3':
+            path = output_path + '.mp3'
+        else:
+            downloads = info.get('requested_downloads') or [{}]
+            path = downloads[0].get('filepath') or ydl.prepare_filename(info)
+        if os.path.exists(path):
+            timer.add(bytes=os.path.getsize(path))
+    return path
+
+def fetch_audio(url, output_path, config):
+    """Get a video's audio into output_path + extension, via the media cache."""
+    audio_format = config.get('DEFAULT', 'download_format', fallback='native')
+    quality = config.get('DEFAULT', 'audio_quality', fallback='192')
+    if not config.getboolean('DEFAULT', 'media_cache', fallback=True):
+        return download_audio(url, output_path, audio_format, quality)
+
+    media_cache.configure(config.getfloat('DEFAULT', 'media_cache_mb', fallback=media_cache.DEFAULT_MAX_MB))
+    key = media_cache.video_key(url)
+    fmt = media_cache.format_label(audio_format, quality)
+    audio_path = media_cache.link_cached(key, fmt, output_path)
+    if audio_path:
+        print(f"♻️  Reusing cached audio for {key[0]} video {key[1]}")
     else:
-        print("Transcribing audio... This may take several minutes depending on audio length.")
-        result = model.transcribe(audio_path, verbose=True)
-        return result['text']
+        downloaded = download_audio(url, media_cache.staging_base(key, fmt), audio_format, quality)
+        audio_path = media_cache.store_and_link(downloaded, key, fmt, output_path)
+    media_cache.evict()
+    return audio_path
+
+def transcribe_audio(audio_path, model='small', settings=None, transcript_path=None, on_segment=None):
+    """Transcribe audio to text using Whisper.
 
-def translate_text(text, api_key, target_lang='es'):
+    Segments are printed and appended to transcript_path as each chunk
+    finishes; use stream_transcriber.transcribe_segments to consume them directly.
+    """
+    print("Transcribing audio... Segments appear as each chunk is finished.")
+    return stream_transcriber.transcribe_to_text(
+        audio_path, model=model, device='cpu', settings=settings,
+        transcript_path=transcript_path, on_segment=on_segment,
+    )
+
+def translate_text(text, api_key, target_lang='es', backend=None, settings=None):
     """Translate text using Gemini API."""
     print("Connecting to Gemini API...")
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    prompt = f"Translate the following English text to Spanish: {text}"
+    if backend is None:
+        backend = translation_engine.GeminiBackend(api_key, 'gemini-1.5-flash')
     print("Translating text... Please wait.")
-    response = model.generate_content(prompt)
+    translated = translation_engine.translate_text(
+        text, backend, target_lang=target_lang, **(settings or {})
+    )
     print("Translation completed.")
-    return response.text
+    if getattr(backend, 'scheduler', None):
+        print(f"📊 Gemini API: {backend.scheduler.summary()}")
+    return translated
 
-def text_to_speech(text, output_path='output.mp3', lang='es'):
+def text_to_speech(text, output_path='output.mp3', lang='es', backend=None, settings=None):
     """Convert text to speech using gTTS."""
     print("Generating Spanish audio... This may take a moment.")
-    tts = gTTS(text=text, lang=lang, slow=False)
-    tts.save(output_path)
+    if backend is None:
+        backend = tts_engine.GTTSBackend(lang=lang)
+    tts_engine.synthesize_to_file(text, output_path, backend, **(settings or {}))
     print("Audio generation completed.")
     return output_path
 
-def process_youtube(api_key):
-    """Process a YouTube video: download, transcribe, translate, and convert to audio."""
+def transcript_blocks(audio_path, transcript_path, config, segments=None):
+    """Yield (separator, text) blocks of the transcript while Whisper runs.
+
+    The transcript file is written block by block as a side effect.
+    segments replaces the transcription of audio_path, e.g. for a stream.
+    """
+    if segments is None:
+        segments = stream_transcriber.transcribe_segments(
+            audio_path,
+            model=config.get('DEFAULT', 'whisper_model', fallback='small'),
+            device='cpu',
+            settings=stream_transcriber.settings_from_config(config),
+        )
+    max_chars = config.getint('DEFAULT', 'pipeline_block_chars', fallback=2000)
+    with open(transcript_path, 'w', encoding='utf-8') as f:
+        for i, block in enumerate(pipeline.group_segments(segments, max_chars)):
+            separator = " " if i else ""
+            f.write(separator + block)
+            f.flush()
+            print(f"📝 Transcribed block {i+1} ({len(block)} characters)")
+            yield separator, block
+
+def text_blocks(text, config):
+    """Split an existing text into (separator, text) blocks for the pipeline."""
+    max_chars = config.getint('DEFAULT', 'pipeline_block_chars', fallback=2000)
+    return translation_engine.split_text(text, max(1, max_chars // 4))
+
+def translate_and_speak(blocks, process_folder, api_key, config):
+    """Translate and synthesize blocks in a pipeline.
+
+    Block N is translated and turned into audio while block N+1 is still
+    being produced. translated.txt grows as blocks finish, and the audio
+    parts are joined into output.mp3 at the end.
+    """
+    target_lang = config.get('DEFAULT', 'target_language', fallback='es')
+    backend = translation_engine.backend_from_config(config, api_key)
+    settings = translation_engine.settings_from_config(config)
+    tts_backend = tts_engine.backend_from_config(config, lang=target_lang)
+    tts_settings = tts_engine.settings_from_config(config)
+    parts_folder = os.path.join(process_folder, 'parts')
+    os.makedirs(parts_folder, exist_ok=True)
+
+    translated_path = os.path.join(process_folder, 'translated.txt')
+    translated_file = open(translated_path, 'w', encoding='utf-8')
+    part_numbers = itertools.count(1)
+
+    def translate_stage(item):
+        separator, block = item
+        translated = translation_engine.translate_text(block, backend, target_lang=target_lang, **settings)
+        translated_file.write(separator + translated)
+        translated_file.flush()
+        return translated
+
+    def speech_stage(translated):
+        part_path = os.path.join(parts_folder, f"part_{next(part_numbers):04d}.mp3")
+        return text_to_speech(translated, part_path, lang=target_lang,
+                              backend=tts_backend, settings=tts_settings)
+
+    try:
+        # A translation or TTS failure lets Whisper finish, so a resume reuses the whole transcript
+        parts = pipeline.run_pipeline(
+            blocks,
+            [('translate', translate_stage), ('tts', speech_stage)],
+            queue_size=config.getint('DEFAULT', 'pipeline_queue_size', fallback=2),
+            finish_source=True,
+        )
+    finally:
+        translated_file.close()
+
+    if not parts:
+        # Same outcome as text_to_speech on an empty text: the job fails rather than ending with silence
+        raise RuntimeError("No speech was detected, so there is nothing to translate or voice")
+    spanish_audio_path = tts_engine.concat_mp3(parts, os.path.join(process_folder, 'output.mp3'))
+    if not config.getboolean('DEFAULT', 'keep_temp_files', fallback=True):
+        shutil.rmtree(parts_folder, ignore_errors=True)
+    if getattr(backend, 'scheduler', None):
+        print(f"📊 Gemini API: {backend.scheduler.summary()}")
+    return translated_path, spanish_audio_path
+
+# Config keys that change each stage's output, part of its checkpoint key
+TRANSCRIBE_KEYS = ('whisper_model', 'chunk_size_minutes', 'stream_chunk_seconds', 'skip_silence',
+                   'silence_threshold_db', 'skip_silence_seconds')
+TRANSLATE_KEYS = ('target_language', 'translation_backend', 'translation_chunk_tokens')
+TTS_KEYS = ('target_language', 'tts_backend', 'tts_voice', 'tts_speed', 'tts_piece_chars')
+
+def stage_settings(config, keys):
+    """Pick the config values in keys, for a stage's checkpoint key."""
+    return {key: config.get('DEFAULT', key, fallback=None) for key in keys}
+
+def read_text(path):
+    """Read a UTF-8 text file written by an earlier stage."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def download_stage(stages, url, process_folder, config):
+    """Run (or reuse) the download stage of a YouTube job; return the audio path."""
+    inputs = checkpoint.inputs_key(url, stage_settings(config, ('download_format', 'audio_quality')))
+    return stages.run('download', inputs, lambda: {
+        'audio': fetch_audio(url, os.path.join(process_folder, 'audio'), config),
+    })['audio']
+
+def transcribe_stage_inputs(audio_path, config):
+    """Checkpoint key of the transcription of audio_path."""
+    return checkpoint.inputs_key(checkpoint.file_key(audio_path), stage_settings(config, TRANSCRIBE_KEYS))
+
+def transcribe_stage(stages, audio_path, transcript_path, config):
+    """Run (or reuse) the transcription stage on its own; return the transcript path."""
+    def transcribe():
+        transcribe_audio(
+            audio_path,
+            model=config.get('DEFAULT', 'whisper_model', fallback='small'),
+            settings=stream_transcriber.settings_from_config(config),
+            transcript_path=transcript_path,
+        )
+        return {'transcript': transcript_path}
+
+    return stages.run('transcribe', transcribe_stage_inputs(audio_path, config), transcribe)['transcript']
+
+def process_youtube(api_key, config=None, url=None, process_folder=None):
+    """Process a YouTube video: download, transcribe, translate, and convert to audio.
+
+    Asks for the URL when url is not given. Each stage is checkpointed in
+    the process folder; pass process_folder to resume a job there, reusing
+    the stages already finished. Returns a dict with the process folder
+    and the files written, or None if nothing was produced.
+    """
     print("\n" + "="*50)
     print("📺 YouTube Processing Mode")
     print("="*50)
 
+    if config is None:
+        config = load_config()
+    transcript_cache.configure(config.getfloat('DEFAULT', 'transcript_cache_mb', fallback=2048))
+    metrics.configure(**metrics.settings_from_config(config))
+
     # Get YouTube URL
-    url = input("Enter YouTube URL: ").strip()
+    if url is None:
+        url = input("Enter YouTube URL: ").strip()
     if not url:
         print("❌ No URL provided")
-        return
+        return None
 
     # Create process folder
-    process_folder = create_process_folder()
-    print(f"📁 Created process folder: {process_folder}")
-
-    # Step 1: Download audio
-    print("\n=== STEP 1: Downloading audio ===")
-    audio_path = download_audio(url, os.path.join(process_folder, 'audio'))
-    if not audio_path:
-        print("❌ Failed to download audio")
-        return
-    print(f"Audio downloaded successfully: {audio_path}")
+    if process_folder is None:
+        process_folder = create_process_folder()
+        print(f"📁 Created process folder: {process_folder}")
+    else:
+        print(f"📁 Resuming process folder: {process_folder}")
+    stages = checkpoint.Checkpoint(process_folder, job={
+        'type': 'youtube', 'url': url,
+        'target_language': config.get('DEFAULT', 'target_language', fallback='es'),
+        'model': config.get('DEFAULT', 'whisper_model', fallback='small'),
+    })
+    stages.mark_job('running')
+    job_metrics = metrics.start_job(process_folder, type='youtube')
+    status = 'failed'
 
-    # Step 2: Transcribe
-    print("\n=== STEP 2: Transcribing audio ===")
-    transcript = transcribe_audio(audio_path)
     transcript_path = os.path.join(process_folder, 'transcript.txt')
-    with open(transcript_path, 'w', encoding='utf-8') as f:
-        f.write(transcript)
-    print(f"Transcript saved to {transcript_path}")
-
-    # Step 3: Translate
-    print("\n=== STEP 3: Translating to Spanish ===")
-    translated_text = translate_text(transcript, api_key)
     translated_path = os.path.join(process_folder, 'translated.txt')
-    with open(translated_path, 'w', encoding='utf-8') as f:
-        f.write(translated_text)
-    print(f"Translated text saved to {translated_path}")
+    output_path = os.path.join(process_folder, 'output.mp3')
+    translate_inputs = stage_settings(config, TRANSLATE_KEYS)
+    tts_inputs = stage_settings(config, TTS_KEYS)
+    try:
+        if config.getboolean('DEFAULT', 'stream_download', fallback=False):
+            # All steps overlap: Whisper starts on the first minutes while the rest downloads
+            print("\n=== STEPS 1-4: Streaming, transcribing, translating and generating audio ===")
+
+            # Checkpointed as 'transcribe' then 'translate_tts', so a resume skips Whisper
+            # once the whole transcript is on disk
+            transcribe_inputs = checkpoint.inputs_key(url, stage_settings(config, TRANSCRIBE_KEYS))
+            if stages.finished('transcribe', transcribe_inputs):
+                print("♻️  Stage 'transcribe' already done, reusing its output")
+                blocks = text_blocks(read_text(transcript_path), config)
+            else:
+                segments = stream_transcriber.transcribe_url_segments(
+                    url,
+                    model=config.get('DEFAULT', 'whisper_model', fallback='small'),
+                    device='cpu',
+                    settings=stream_transcriber.settings_from_config(config),
+                )
+                blocks = stages.track('transcribe', transcribe_inputs,
+                                      transcript_blocks(None, transcript_path, config, segments=segments),
+                                      {'transcript': transcript_path})
+
+            def speak():
+                translated, audio = translate_and_speak(blocks, process_folder, api_key, config)
+                return {'transcript': transcript_path, 'translated': translated, 'output': audio}
+
+            outputs = stages.run('translate_tts', checkpoint.inputs_key(
+                transcribe_inputs, translate_inputs, tts_inputs), speak)
+            print(f"Transcript saved to {outputs['transcript']}")
+            print(f"Translated text saved to {outputs['translated']}")
+            print(f"Spanish audio saved to {outputs['output']}")
+            status = 'done'
+            stages.mark_job('done')
+            print("\n🎉 YouTube processing completed successfully!")
+            print(f"All files saved in: {process_folder}")
+            return dict(outputs, folder=process_folder)
+
+        # Step 1: Download audio
+        print("\n=== STEP 1: Downloading audio ===")
+        audio_path = download_stage(stages, url, process_folder, config)
+        if not audio_path:
+            print("❌ Failed to download audio")
+            stages.mark_job('failed')
+            return None
+        print(f"Audio downloaded successfully: {audio_path}")
+
+        transcribe_inputs = transcribe_stage_inputs(audio_path, config)
+        if config.getboolean('DEFAULT', 'pipeline_mode', fallback=True):
+            # Steps 2-4 overlap: blocks are translated and voiced while Whisper continues
+            print("\n=== STEPS 2-4: Transcribing, translating and generating audio (pipelined) ===")
+            if stages.finished('transcribe', transcribe_inputs):
+                print("♻️  Stage 'transcribe' already done, reusing its output")
+                blocks = text_blocks(read_text(transcript_path), config)
+            else:
+                blocks = stages.track('transcribe', transcribe_inputs,
+                                      transcript_blocks(audio_path, transcript_path, config),
+                                      {'transcript': transcript_path})
+            speak_inputs = checkpoint.inputs_key(transcribe_inputs, translate_inputs, tts_inputs)
+
+            def speak():
+                translated, audio = translate_and_speak(blocks, process_folder, api_key, config)
+                return {'translated': translated, 'output': audio}
+
+            outputs = stages.run('translate_tts', speak_inputs, speak)
+            translated_path, spanish_audio_path = outputs['translated'], outputs['output']
+            print(f"Transcript saved to {transcript_path}")
+            print(f"Translated text saved to {translated_path}")
+            print(f"Spanish audio saved to {spanish_audio_path}")
+        else:
+            # Step 2: Transcribe
+            print("\n=== STEP 2: Transcribing audio ===")
+            transcribe_stage(stages, audio_path, transcript_path, config)
+            print(f"Transcript saved to {transcript_path}")
+
+            # Step 3: Translate
+            print("\n=== STEP 3: Translating to Spanish ===")
 
-    # Step 4: Generate Spanish audio
-    print("\n=== STEP 4: Generating Spanish audio ===")
-    spanish_audio_path = text_to_speech(translated_text, os.path.join(process_folder, 'output.mp3'))
-    print(f"Spanish audio saved to {spanish_audio_path}")
+            def translate():
+                translated_text = translate_text(
+                    read_text(transcript_path), api_key,
+                    target_lang=config.get('DEFAULT', 'target_language', fallback='es'),
+                    backend=translation_engine.backend_from_config(config, api_key),
+                    settings=translation_engine.settings_from_config(config),
+                )
+                with open(translated_path, 'w', encoding='utf-8') as f:
+                    f.write(translated_text)
+                return {'translated': translated_path}
+
+            stages.run('translate', checkpoint.inputs_key(
+                checkpoint.file_key(transcript_path), translate_inputs), translate)
+            print(f"Translated text saved to {translated_path}")
+
+            # Step 4: Generate Spanish audio
+            print("\n=== STEP 4: Generating Spanish audio ===")
+            target_lang = config.get('DEFAULT', 'target_language', fallback='es')
+
+            def speak():
+                return {'output': text_to_speech(
+                    read_text(translated_path), output_path, lang=target_lang,
+                    backend=tts_engine.backend_from_config(config, lang=target_lang),
+                    settings=tts_engine.settings_from_config(config),
+                )}
+
+            spanish_audio_path = stages.run('tts', checkpoint.inputs_key(
+                checkpoint.file_key(translated_path), tts_inputs), speak)['output']
+            print(f"Spanish audio saved to {spanish_audio_path}")
+        status = 'done'
+    except BaseException:
+        stages.mark_job('failed')
+        raise
+    finally:
+        job_metrics.finish(status)
+    stages.mark_job('done')
 
     print("\n🎉 YouTube processing completed successfully!")
     print(f"All files saved in: {process_folder}")
     print("Files generated:")
-    print(f"- {audio_path} (English audio)")
+    print(f"- {audio_path} (Original audio)")
     print(f"- {transcript_path} (English transcript)")
     print(f"- {translated_path} (Spanish translation)")
     print(f"- {spanish_audio_path} (Spanish audio)")
+    return {'folder': process_folder, 'audio': audio_path, 'transcript': transcript_path,
+            'translated': translated_path, 'output': spanish_audio_path}
+
+def read_url_sources(answer):
+    """Turn the user's answer into URLs: a file with one URL per line, or URLs separated by spaces."""
+    if os.path.isfile(answer):
+        with open(answer, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+        return [line for line in lines if line and not line.startswith('#')]
+    return answer.split()
+
+def _playlist_entries(url, depth=0):
+    """Yield (url, title) for every video behind a playlist or channel URL."""
+    with yt_dlp.YoutubeDL({'quiet': True, 'extract_flat': 'in_playlist'}) as ydl:
+        info = ydl.extract_info(url, download=False)
+    if info.get('_type') != 'playlist':
+        yield info.get('webpage_url') or url, info.get('title') or info.get('id')
+        return
+    for entry in info.get('entries') or []:
+        if not entry:
+            continue
+        entry_url = entry.get('url') or entry.get('webpage_url')
+        # Channels list their tabs (videos, shorts, live) as nested playlists
+        if entry.get('_type') == 'playlist' or str(entry.get('ie_key', '')).endswith('Tab'):
+            if depth < 2 and entry_url:
+                yield from _playlist_entries(entry_url, depth + 1)
+            continue
+        if entry_url:
+            yield entry_url, entry.get('title') or entry.get('id')
+
+def expand_urls(sources):
+    """Expand playlists and channels into unique videos, keeping their order."""
+    items = []
+    seen = set()
+    for source in sources:
+        if media_cache.youtube_id(source) and 'list=' not in source:
+            found = [(source, None)]
+        else:
+            try:
+                found = list(_playlist_entries(source))
+            except Exception as e:
+                print(f"❌ Could not read {source}: {e}")
+                continue
+            print(f"📚 {source}: {len(found)} videos")
+        for url, title in found:
+            try:
+                key = media_cache.video_key(url)
+            except Exception:
+                key = url
+            if key in seen:
+                continue
+            seen.add(key)
+            items.append({'url': url, 'title': title, 'key': key})
+    return items
+
+def process_youtube_batch(api_key, config=None, sources=None):
+    """Process many videos: playlists, channels or a file of URLs.
+
+    Downloads run download_concurrency at a time and each finished one is
+    queued for a single Whisper worker, so transcription never waits on
+    the network. Translation and speech run in their own stages behind
+    it, and a failed video is recorded without stopping the others.
+    """
+    print("\n" + "="*50)
+    print("📚 YouTube Batch Mode")
+    print("="*50)
+
+    if config is None:
+        config = load_config()
+    transcript_cache.configure(config.getfloat('DEFAULT', 'transcript_cache_mb', fallback=2048))
+    metrics.configure(**metrics.settings_from_config(config))
+
+    if sources is None:
+        answer = input("Enter playlist/channel URLs or a file with one URL per line: ").strip()
+        sources = read_url_sources(answer) if answer else []
+    items = expand_urls(sources)
+    if not items:
+        print("❌ No videos to process")
+        return None
+
+    batch_folder = make_timestamped_folder("output", "castellanator_batch")
+    print(f"📁 Created batch folder: {batch_folder}")
+    total = len(items)
+    for i, item in enumerate(items):
+        video_id = item['key'][1] if isinstance(item['key'], tuple) else "video"
+        item['folder'] = os.path.join(batch_folder, f"{i+1:03d}_{video_id}")
+        item['status'] = 'pending'
+
+    target_lang = config.get('DEFAULT', 'target_language', fallback='es')
+    model = config.get('DEFAULT', 'whisper_model', fallback='small')
+    stream_settings = stream_transcriber.settings_from_config(config)
+    backend = translation_engine.backend_from_config(config, api_key)
+    settings = translation_engine.settings_from_config(config)
+    tts_backend = tts_engine.backend_from_config(config, lang=target_lang)
+    tts_settings = tts_engine.settings_from_config(config)
+    counts = {'downloaded': 0, 'transcribed': 0, 'translated': 0, 'done': 0, 'failed': 0}
+    counts_lock = threading.Lock()
+
+    def count(name):
+        # Stages run in different threads; report the totals as one line
+        with counts_lock:
+            counts[name] += 1
+            print(f"📊 Batch progress: {counts['downloaded']}/{total} downloaded, "
+                  f"{counts['transcribed']} transcribed, {counts['translated']} translated, "
+                  f"{counts['done']} done, {counts['failed']} failed")
+
+    def fail(item, stage, error):
+        item['status'] = 'failed'
+        item['error'] = f"{stage}: {error}"
+        print(f"❌ {item['url']} failed while {stage}: {error}")
+        count('failed')
+
+    def download(item):
+        os.makedirs(item['folder'], exist_ok=True)
+        return fetch_audio(item['url'], os.path.join(item['folder'], 'audio'), config)
+
+    def downloaded_items():
+        pool = ThreadPoolExecutor(max_workers=max(1, config.getint('DEFAULT', 'download_concurrency', fallback=3)))
+        try:
+            futures = {pool.submit(metrics.bind(download), item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    item['audio'] = future.result()
+                    count('downloaded')
+                except Exception as e:
+                    fail(item, 'downloading', e)
+                yield item
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def transcribe_stage(item):
+        if item['status'] == 'failed':
+            return item
+        try:
+            item['transcript'] = os.path.join(item['folder'], 'transcript.txt')
+            item['text'] = stream_transcriber.transcribe_to_text(
+                item['audio'], model=model, device='cpu', settings=stream_settings,
+                transcript_path=item['transcript'], verbose=False,
+            )
+            count('transcribed')
+        except Exception as e:
+            fail(item, 'transcribing', e)
+        return item
+
+    def translate_stage(item):
+        if item['status'] == 'failed':
+            return item
+        try:
+            translated = translation_engine.translate_text(item.pop('text'), backend, target_lang=target_lang, **settings)
+            item['translated'] = os.path.join(item['folder'], 'translated.txt')
+            with open(item['translated'], 'w', encoding='utf-8') as f:
+                f.write(translated)
+            item['translated_text'] = translated
+            count('translated')
+        except Exception as e:
+            fail(item, 'translating', e)
+        return item
+
+    def speech_stage(item):
+        if item['status'] == 'failed':
+            return item
+        try:
+            item['output'] = text_to_speech(item.pop('translated_text'), os.path.join(item['folder'], 'output.mp3'),
+                                            lang=target_lang, backend=tts_backend, settings=tts_settings)
+            item['status'] = 'done'
+            count('done')
+        except Exception as e:
+            fail(item, 'generating audio', e)
+        return item
+
+    with metrics.job(batch_folder, type='batch', videos=total):
+        pipeline.run_pipeline(
+            downloaded_items(),
+            [('transcribe', transcribe_stage), ('translate', translate_stage), ('tts', speech_stage)],
+            queue_size=config.getint('DEFAULT', 'pipeline_queue_size', fallback=2),
+        )
+
+    summary_path = os.path.join(batch_folder, 'batch.json')
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'sources': sources,
+            'finished': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'items': [{k: v for k, v in item.items() if k != 'key'} for item in items],
+        }, f, indent=2, ensure_ascii=False)
+    if getattr(backend, 'scheduler', None):
+        print(f"📊 Gemini API: {backend.scheduler.summary()}")
+
+    print(f"\n🎉 Batch finished: {counts['done']}/{total} videos done, {counts['failed']} failed")
+    print(f"All files saved in: {batch_folder}")
+    print(f"Summary: {summary_path}")
+    return batch_folder
+
+def unfinished_jobs(output_dir="output"):
+    """List (folder, job) for process folders whose job did not finish."""
+    found = []
+    if not os.path.isdir(output_dir):
+        return found
+    for name in sorted(os.listdir(output_dir)):
+        folder = os.path.join(output_dir, name)
+        data = checkpoint.load(folder) if os.path.isdir(folder) else None
+        if data and data.get('job') and data.get('status') != 'done':
+            found.append((folder, data['job']))
+    return found
+
+def resume_job(api_key, process_folder, config=None):
+    """Continue the job in process_folder from its first unfinished stage."""
+    data = checkpoint.load(process_folder)
+    if not data or not data.get('job'):
+        print(f"❌ No checkpoint found in {process_folder}")
+        return None
+    if config is None:
+        config = load_config()
+    job = data['job']
+    # Keep the job's own language and model, so finished stages still match
+    config = copy_config(config)
+    if job.get('target_language'):
+        config.set('DEFAULT', 'target_language', job['target_language'])
+    if job.get('model'):
+        config.set('DEFAULT', 'whisper_model', job['model'])
+    if job['type'] == 'youtube':
+        return process_youtube(api_key, config, url=job['url'], process_folder=process_folder)
+    section_pages = job.get('section_pages') or load_progress_section_pages(process_folder)
+    if section_pages:
+        # Sectioned folders are found again from the file; keep the section size they were cut with
+        config.set('DEFAULT', 'pdf_section_pages', str(section_pages))
+        return process_pdf(api_key, config, pdf_path=job['pdf'])
+    return process_pdf(api_key, config, pdf_path=job['pdf'], process_folder=process_folder)
+
+def choose_job_to_resume():
+    """Ask which unfinished job to resume; return its folder or None."""
+    jobs = unfinished_jobs()
+    if not jobs:
+        print("✅ No unfinished jobs to resume")
+        return None
+    print("\nUnfinished jobs:")
+    for i, (folder, job) in enumerate(jobs, 1):
+        print(f"{i}. {os.path.basename(folder)} - {job['type']}: {job.get('url') or job.get('pdf')}")
+    answer = input(f"Select a job (1-{len(jobs)}): ").strip()
+    try:
+        return jobs[int(answer) - 1][0]
+    except (ValueError, IndexError):
+        print("❌ Invalid selection")
+        return None
 
 def main():
     """Main function with menu system."""
@@ -303,23 +1094,40 @@ def main():
         print("❌ No API key provided")
         return
 
+    # Load settings once for the whole session
+    config = load_config()
+
     # Create necessary folders
     create_folders()
 
+    # Resume straight from the command line: --resume <process folder>
+    if len(sys.argv) == 3 and sys.argv[1] == '--resume':
+        result = resume_job(api_key, sys.argv[2], config)
+        sys.exit(0 if result else 1)
+
     # Main menu loop
     while True:
         choice = show_menu()
 
         if choice == '1':
-            process_youtube(api_key)
+            process_youtube(api_key, config)
         elif choice == '2':
-            process_pdf(api_key)
+            process_pdf(api_key, config)
         elif choice == '3':
+            process_youtube_batch(api_key, config)
+        elif choice == '4':
+            process_folder = choose_job_to_resume()
+            if process_folder:
+                resume_job(api_key, process_folder, config)
+        elif choice == '5':
             print("\n👋 Thank you for using Castellanator!")
             print("Files are saved in the 'procesos' folder.")
             break
         else:
-            print("❌ Invalid choice. Please select 1, 2, or 3.")
+            print("❌ Invalid choice. Please select 1, 2, 3, 4, or 5.")
+
+        # Free Whisper models left idle while the user was away
+        model_registry.release_idle_models()
 
         print("\n" + "-"*50)
         input("Press Enter to continue...")